@@ -1,5 +1,6 @@
 # Constant formatting utilities for GLSL code generation
 
+from ...ir.graph import ValueKind
 from ...ir.types import DataType
 
 
@@ -59,3 +60,10 @@ def format_constant(value, dtype: DataType) -> str:
         except:
             return "0.0"
 
+
+
+def constant_value(val):
+    """Return the Python literal behind a CONSTANT Value, or None if not known at codegen time."""
+    if val is None or val.kind != ValueKind.CONSTANT or val.origin is None:
+        return None
+    return val.origin.attrs.get('value')
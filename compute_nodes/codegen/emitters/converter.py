@@ -147,16 +147,13 @@ def emit_map_range(op, ctx):
     is_vector = data_type == 'FLOAT_VECTOR'
     
     if is_vector:
-        # Vector mode - use vec3 version for LINEAR, component-wise for others
-        if interpolation_type == 'LINEAR':
-            result = f"map_range_linear_vec3({value}, {from_min}, {from_max}, {to_min}, {to_max})"
-        elif interpolation_type == 'STEPPED':
-            # Component-wise stepped
-            result = f"vec3(map_range_stepped({value}.x, {from_min}.x, {from_max}.x, {to_min}.x, {to_max}.x, {steps}), map_range_stepped({value}.y, {from_min}.y, {from_max}.y, {to_min}.y, {to_max}.y, {steps}), map_range_stepped({value}.z, {from_min}.z, {from_max}.z, {to_min}.z, {to_max}.z, {steps}))"
+        # Vector mode - one vec3 call per interpolation type
+        if interpolation_type == 'STEPPED':
+            result = f"map_range_stepped_vec3({value}, {from_min}, {from_max}, {to_min}, {to_max}, {steps})"
         elif interpolation_type == 'SMOOTHSTEP':
-            result = f"vec3(map_range_smoothstep({value}.x, {from_min}.x, {from_max}.x, {to_min}.x, {to_max}.x), map_range_smoothstep({value}.y, {from_min}.y, {from_max}.y, {to_min}.y, {to_max}.y), map_range_smoothstep({value}.z, {from_min}.z, {from_max}.z, {to_min}.z, {to_max}.z))"
+            result = f"map_range_smoothstep_vec3({value}, {from_min}, {from_max}, {to_min}, {to_max})"
         elif interpolation_type == 'SMOOTHERSTEP':
-            result = f"vec3(map_range_smootherstep({value}.x, {from_min}.x, {from_max}.x, {to_min}.x, {to_max}.x), map_range_smootherstep({value}.y, {from_min}.y, {from_max}.y, {to_min}.y, {to_max}.y), map_range_smootherstep({value}.z, {from_min}.z, {from_max}.z, {to_min}.z, {to_max}.z))"
+            result = f"map_range_smootherstep_vec3({value}, {from_min}, {from_max}, {to_min}, {to_max})"
         else:
             result = f"map_range_linear_vec3({value}, {from_min}, {from_max}, {to_min}, {to_max})"
         
@@ -4,6 +4,7 @@
 from ...ir.graph import ValueKind, _trace_resource_index
 from ...ir.types import DataType
 from ...ir.ops import OpCode
+from ...ir.resources import ResourceAccess
 
 
 def _find_resource_index_from_value(val, graph=None):
@@ -53,7 +54,7 @@ def emit_image_store(op, ctx):
         res = graph.resources[data_val.resource_index]
         
         # Use texelFetch only for READ-only samplers, imageLoad for images
-        if res.access.name == 'READ':
+        if res.access == ResourceAccess.READ:
             data = f"texelFetch({data}, {coord}, 0)"
         else:
             # READ_WRITE or WRITE - it's an image, use imageLoad
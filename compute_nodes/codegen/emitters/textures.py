@@ -1,6 +1,79 @@
 # Texture Operation Emitters
 # Handles: NOISE, WHITE_NOISE, VORONOI
 
+import math
+
+from .const import constant_value
+
+# Voronoi features that go through fractal_voronoi_* and have a _nofractal variant
+VORONOI_FRACTAL_FEATURES = frozenset({'F1', 'SMOOTH_F1', 'F2', 'DISTANCE_TO_EDGE'})
+
+# Largest finite float32, the bound for literals passed to the shader
+_FLT_MAX = 3.4028234663852886e38
+
+
+def _is_const_non_positive(val) -> bool:
+    """True if val is a compile-time scalar constant <= 0 (clamped to zero in GLSL)."""
+    c = constant_value(val)
+    return isinstance(c, (int, float)) and not isinstance(c, bool) and c <= 0.0
+
+
+def voronoi_entry_point(op) -> str:
+    """Name of the node_tex_voronoi_* entry point op calls, without the dimension suffix."""
+    feature = op.attrs.get('feature', 'F1')
+    entry = feature.lower()
+    # Partial evaluation: with Detail or Roughness pinned to zero the fractal
+    # loop runs exactly one octave, so call the single-octave entry point.
+    if feature in VORONOI_FRACTAL_FEATURES and (
+        _is_const_non_positive(op.inputs[3]) or _is_const_non_positive(op.inputs[4])
+    ):
+        entry += "_nofractal"
+    return entry
+
+
+def _const_number(val):
+    """Compile-time numeric constant value of val, or None."""
+    c = constant_value(val)
+    if isinstance(c, (int, float)) and not isinstance(c, bool):
+        return float(c)
+    return None
+
+
+def _voronoi_max_distance(op, dims: str, metric: str):
+    """
+    Precompute voronoi_distance(T(0), T(0.5 + 0.5 * randomness)) on the CPU.
+
+    The value only depends on Randomness (and Exponent for Minkowski), so when
+    those are constants it is passed as a literal instead of being recomputed
+    per invocation. Returns None when it has to stay in the shader.
+    """
+    rand = _const_number(op.inputs[8])
+    if rand is None:
+        return None
+    v = 0.5 + 0.5 * min(max(rand, 0.0), 1.0)
+    n = {'1D': 1, '2D': 2, '3D': 3, '4D': 4}.get(dims, 3)
+    if n == 1:
+        return v
+    if metric == 'EUCLIDEAN':
+        return v * math.sqrt(n)
+    if metric == 'MANHATTAN':
+        return v * n
+    if metric == 'CHEBYCHEV':
+        return v
+    if metric == 'MINKOWSKI':
+        exponent = _const_number(op.inputs[7])
+        if not exponent:
+            return None
+        try:
+            dist = (n * v ** exponent) ** (1.0 / exponent)
+        except OverflowError:
+            return None
+        # Tiny exponents blow past float32; leave those to the shader
+        if not math.isfinite(dist) or dist > _FLT_MAX:
+            return None
+        return dist
+    return None
+
 
 def emit_noise(op, ctx):
     """Emit noise texture function call."""
@@ -83,7 +156,6 @@ def emit_voronoi(op, ctx):
     param = ctx.param
     
     dims = op.attrs.get('dimensions', '3D')
-    feature = op.attrs.get('feature', 'F1')
     metric = op.attrs.get('metric', 'EUCLIDEAN')
     normalize = "1.0f" if op.attrs.get('normalize', False) else "0.0f"
     
@@ -130,12 +202,14 @@ def emit_voronoi(op, ctx):
     elif dims == '2D':
         co_arg = f"({co}).xy"
     
-    feat_lower = feature.lower()
+    func_name = f"node_tex_voronoi_{voronoi_entry_point(op)}_{suffix}"
     
-    func_name = f"node_tex_voronoi_{feat_lower}_{suffix}"
+    # -1 tells the shader to compute max_distance itself
+    max_dist = _voronoi_max_distance(op, dims, metric)
+    max_dist_arg = "-1.0f" if max_dist is None else f"{max_dist!r}f"
     
     call_args = [
-        co_arg, w, scale, detail, rough, lacu, smooth, exp, rand, metric_val, normalize,
+        co_arg, w, scale, detail, rough, lacu, smooth, exp, rand, metric_val, normalize, max_dist_arg,
         v_dist, v_col, v_pos, v_w, v_rad
     ]
     
@@ -9,8 +9,10 @@ from ..planner.passes import ComputePass
 from .shader_lib.registry import (
     generate_selective_header, 
     get_bundle_requirements,
-    OPCODE_BUNDLE_REQUIREMENTS
+    GLSL_BUNDLES,
 )
+from .shader_lib.voronoi import get_voronoi_glsl
+from .emitters.textures import voronoi_entry_point
 
 # Mapping from OpCode to bundle keys
 OPCODE_TO_BUNDLE_KEY = {
@@ -50,6 +52,8 @@ class ShaderGenerator:
         # Initialize tracking for tree-shaking
         self._required_bundles: Set[str] = set()
         self._required_funcs: Set[str] = set()
+        self._voronoi_metrics: Set[str] = set()
+        self._voronoi_entries: Set[tuple] = set()  # (dims, entry point) pairs
         
         # SSA inlining: Track which ops to inline vs emit as statements
         self._inlined_ops: Set[int] = set()  # op ids that will be inlined
@@ -113,10 +117,19 @@ class ShaderGenerator:
 
     def _generate_selective_header(self) -> str:
         """Generate minimal GLSL header with only needed functions."""
-        return generate_selective_header(
+        # A single Voronoi metric in the pass: ship the branch-free distance overloads
+        if len(self._voronoi_metrics) == 1 and 'voronoi_distance' in self._required_bundles:
+            metric_key = f"voronoi_distance_{next(iter(self._voronoi_metrics)).lower()}"
+            if metric_key in GLSL_BUNDLES:
+                self._required_bundles.discard('voronoi_distance')
+                self._required_bundles.add(metric_key)
+        header = generate_selective_header(
             self._required_funcs, 
             self._required_bundles
         )
+        if self._voronoi_entries:
+            header += get_voronoi_glsl(frozenset(self._voronoi_entries))
+        return header
 
     def _generate_bindings(self, compute_pass: ComputePass) -> str:
         lines = []
@@ -185,6 +198,11 @@ class ShaderGenerator:
         """Track which GLSL library bundles are needed for this operation."""
         if op.opcode in OPCODE_TO_BUNDLE_KEY:
             bundle_key = OPCODE_TO_BUNDLE_KEY[op.opcode]
+            if op.opcode == OpCode.VORONOI:
+                # Shared parts come from bundles; the entry point and the
+                # functions it calls are assembled by get_voronoi_glsl
+                self._voronoi_entries.add((op.attrs.get('dimensions', '3D'), voronoi_entry_point(op)))
+                self._voronoi_metrics.add(op.attrs.get('metric', 'EUCLIDEAN'))
             bundles = get_bundle_requirements(bundle_key)
             self._required_bundles.update(bundles)
 
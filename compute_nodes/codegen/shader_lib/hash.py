@@ -155,8 +155,7 @@ int3 hash_pcg3d_i(int3 v) {
   return v;
 }
 
-int4 hash_pcg4d_i(int4 v) {
-  v = v * 1664525 + 1013904223;
+int4 hash_pcg4d_i_rounds(int4 v) {
   v.x += v.y * v.w;
   v.y += v.z * v.x;
   v.z += v.x * v.y;
@@ -169,6 +168,10 @@ int4 hash_pcg4d_i(int4 v) {
   return v;
 }
 
+int4 hash_pcg4d_i(int4 v) {
+  return hash_pcg4d_i_rounds(v * 1664525 + 1013904223);
+}
+
 /* Hashing a number of integers into floats in [0..1] range. */
 
 float2 hash_int2_to_vec2(int2 k) {
@@ -197,6 +200,21 @@ float3 hash_int4_to_vec3(int4 k) {
   return hash_int4_to_vec4(k).xyz;
 }
 
+// Split form of hash_int4_to_vec4(base + offset) for loops with a fixed base:
+// the PCG seed step is linear, so the base part is computed once outside the loop.
+int4 hash_int4_precompute(int4 base) {
+  return base * 1664525 + 1013904223;
+}
+
+float4 hash_int4_finalize_to_vec4(int4 state, int4 offset) {
+  int4 h = hash_pcg4d_i_rounds(state + offset * 1664525);
+  return float4(h & 0x7fffffff) * (1.0 / float(0x7fffffff));
+}
+
+float3 hash_int4_finalize_to_vec3(int4 state, int4 offset) {
+  return hash_int4_finalize_to_vec4(state, offset).xyz;
+}
+
 // Helper definitions for 1D Voronoi (Updated to match Blender 1D logic which uses floats)
 // Blender uses: hash_float_to_float(cellPosition + cellOffset)
 // My code uses int cellPosition. Casting to float mimics Blender's behavior on integral floats.
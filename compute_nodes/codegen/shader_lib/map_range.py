@@ -30,13 +30,36 @@ float map_range_smootherstep(float value, float from_min, float from_max, float
     return to_min + factor * (to_max - to_min);
 }
 
-// Vector versions
+// Vector versions: whole-vec3 arithmetic instead of three scalar calls.
+// Components with from_min == from_max get factor 0, like the float versions.
+vec3 map_range_factor_vec3(vec3 value, vec3 from_min, vec3 from_max) {
+    // 1.0 where the range is non-empty, used as a float mix() weight
+    vec3 valid = vec3(notEqual(from_max, from_min));
+    vec3 range = mix(vec3(1.0), from_max - from_min, valid);
+    return mix(vec3(0.0), (value - from_min) / range, valid);
+}
+
 vec3 map_range_linear_vec3(vec3 value, vec3 from_min, vec3 from_max, vec3 to_min, vec3 to_max) {
-    return vec3(
-        map_range_linear(value.x, from_min.x, from_max.x, to_min.x, to_max.x),
-        map_range_linear(value.y, from_min.y, from_max.y, to_min.y, to_max.y),
-        map_range_linear(value.z, from_min.z, from_max.z, to_min.z, to_max.z)
-    );
+    vec3 factor = map_range_factor_vec3(value, from_min, from_max);
+    return to_min + factor * (to_max - to_min);
+}
+
+vec3 map_range_stepped_vec3(vec3 value, vec3 from_min, vec3 from_max, vec3 to_min, vec3 to_max, float steps) {
+    vec3 factor = map_range_factor_vec3(value, from_min, from_max);
+    factor = floor(factor * (steps + 1.0)) / steps;
+    return to_min + factor * (to_max - to_min);
+}
+
+vec3 map_range_smoothstep_vec3(vec3 value, vec3 from_min, vec3 from_max, vec3 to_min, vec3 to_max) {
+    vec3 factor = clamp(map_range_factor_vec3(value, from_min, from_max), 0.0, 1.0);
+    factor = factor * factor * (3.0 - 2.0 * factor);
+    return to_min + factor * (to_max - to_min);
+}
+
+vec3 map_range_smootherstep_vec3(vec3 value, vec3 from_min, vec3 from_max, vec3 to_min, vec3 to_max) {
+    vec3 factor = clamp(map_range_factor_vec3(value, from_min, from_max), 0.0, 1.0);
+    factor = factor * factor * factor * (factor * (factor * 6.0 - 15.0) + 10.0);
+    return to_min + factor * (to_max - to_min);
 }
 
 // ============ Clamp Functions ============
@@ -609,7 +609,10 @@ from .hash import HASH_GLSL
 from .noise.perlin import NOISE_GLSL
 from .noise.fractal import FRACTAL_GLSL, TEX_NOISE_GLSL
 from .white_noise import WHITE_NOISE_GLSL
-from .voronoi import VORONOI_GLSL
+from .voronoi import (
+    VORONOI_COMMON_GLSL,
+    VORONOI_DISTANCE_GLSL, VORONOI_DISTANCE_METRIC_GLSL,
+)
 from .color import COLOR_GLSL
 from .map_range import MAP_RANGE_GLSL
 
@@ -620,7 +623,12 @@ GLSL_BUNDLES = {
     'fractal': FRACTAL_GLSL,
     'tex_noise': TEX_NOISE_GLSL,
     'white_noise': WHITE_NOISE_GLSL,
-    'voronoi': VORONOI_GLSL,
+    'voronoi': VORONOI_COMMON_GLSL,  # Shared Voronoi structs/helpers
+    'voronoi_distance': VORONOI_DISTANCE_GLSL,  # Runtime metric dispatch
+    'voronoi_distance_euclidean': VORONOI_DISTANCE_METRIC_GLSL['EUCLIDEAN'],
+    'voronoi_distance_manhattan': VORONOI_DISTANCE_METRIC_GLSL['MANHATTAN'],
+    'voronoi_distance_chebychev': VORONOI_DISTANCE_METRIC_GLSL['CHEBYCHEV'],
+    'voronoi_distance_minkowski': VORONOI_DISTANCE_METRIC_GLSL['MINKOWSKI'],
     'color': COLOR_GLSL,
     'map_range': MAP_RANGE_GLSL,
 }
@@ -633,8 +641,10 @@ OPCODE_BUNDLE_REQUIREMENTS = {
     # White Noise needs hash
     'white_noise': {'hash', 'white_noise'},
     
-    # Voronoi needs hash + voronoi
-    'voronoi': {'hash', 'voronoi'},
+    # Voronoi needs hash + voronoi common + distance (the generator may swap
+    # 'voronoi_distance' for a metric-specialized bundle). The entry points a
+    # pass calls are added by the shader generator via voronoi.get_voronoi_glsl
+    'voronoi': {'hash', 'voronoi', 'voronoi_distance'},
     
     # Color conversion
     'separate_color': {'color'},
@@ -652,6 +662,11 @@ BUNDLE_HASH_REQUIREMENTS = {
     'tex_noise': set(),  # Uses hash bundle
     'white_noise': set(),  # Uses hash bundle
     'voronoi': set(),  # Uses hash bundle
+    'voronoi_distance': set(),
+    'voronoi_distance_euclidean': set(),
+    'voronoi_distance_manhattan': set(),
+    'voronoi_distance_chebychev': set(),
+    'voronoi_distance_minkowski': set(),
     'color': set(),
     'map_range': set(),
 }
@@ -660,7 +675,10 @@ BUNDLE_HASH_REQUIREMENTS = {
 def get_bundles_code(bundle_names: Set[str]) -> str:
     """Get combined code for requested bundles in correct order."""
     # Order matters: hash first, then perlin, then fractal, etc.
-    order = ['hash', 'noise_perlin', 'fractal', 'tex_noise', 'white_noise', 'voronoi', 'color', 'map_range']
+    order = ['hash', 'noise_perlin', 'fractal', 'tex_noise', 'white_noise',
+             'voronoi', 'voronoi_distance', 'voronoi_distance_euclidean', 'voronoi_distance_manhattan',
+             'voronoi_distance_chebychev', 'voronoi_distance_minkowski',
+             'color', 'map_range']
     code_parts = []
     for name in order:
         if name in bundle_names and name in GLSL_BUNDLES:
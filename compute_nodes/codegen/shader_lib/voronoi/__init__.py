@@ -1,23 +1,99 @@
 # Voronoi GLSL Functions Package
 # Re-exports all voronoi-related GLSL constants
 
-from .core import SAFE_MATH_GLSL, VORONOI_DEFINES_GLSL, VORONOI_CORE_GLSL
-from .core_4d import VORONOI_CORE_4D_GLSL
-from .fractal import VORONOI_FRACTAL_GLSL
-from .tex import VORONOI_TEX_GLSL
+from functools import lru_cache
 
-# Combined VORONOI_GLSL constant for backward compatibility
-VORONOI_GLSL = (
-    SAFE_MATH_GLSL + 
-    VORONOI_DEFINES_GLSL + 
-    VORONOI_CORE_GLSL + 
-    VORONOI_CORE_4D_GLSL + 
-    VORONOI_FRACTAL_GLSL + 
-    VORONOI_TEX_GLSL
+from .core import (
+    SAFE_MATH_GLSL, VORONOI_DEFINES_GLSL, VORONOI_BASE_GLSL, VORONOI_CORE_GLSL,
+    VORONOI_DISTANCE_GLSL, VORONOI_DISTANCE_METRIC_GLSL,
+    VORONOI_CORE_1D_GLSL, VORONOI_CORE_2D_GLSL, VORONOI_CORE_3D_GLSL,
+    VORONOI_CORE_1D_FUNCS, VORONOI_CORE_2D_FUNCS, VORONOI_CORE_3D_FUNCS,
+)
+from .core_4d import VORONOI_CORE_4D_GLSL, VORONOI_CORE_4D_FUNCS
+from .fractal import VORONOI_FRACTAL_FUNCS, VORONOI_FRACTAL_INSTANCES_GLSL, VORONOI_FRACTAL_GLSL
+from .tex import VORONOI_TEX_FUNCS, VORONOI_TEX_INSTANCES_GLSL, VORONOI_TEX_GLSL
+
+# Dimension-independent part: helpers and structs. The voronoi_distance
+# overloads are shipped separately (generic or metric-specialized).
+VORONOI_COMMON_GLSL = (
+    SAFE_MATH_GLSL +
+    VORONOI_DEFINES_GLSL +
+    VORONOI_BASE_GLSL
 )
 
+_VORONOI_CORE_BY_DIMS = {
+    '1D': VORONOI_CORE_1D_GLSL,
+    '2D': VORONOI_CORE_2D_GLSL,
+    '3D': VORONOI_CORE_3D_GLSL,
+    '4D': VORONOI_CORE_4D_GLSL,
+}
+
+# Per-dimension part: core functions + fractal and node entry point specializations.
+# Lets the shader generator ship only the dimensions a pass actually uses, which
+# keeps the source the GPU driver has to parse small.
+VORONOI_DIMENSION_GLSL = {
+    dims: _VORONOI_CORE_BY_DIMS[dims] + VORONOI_FRACTAL_INSTANCES_GLSL[dims] + VORONOI_TEX_INSTANCES_GLSL[dims]
+    for dims in ('1D', '2D', '3D', '4D')
+}
+
+_VORONOI_CORE_FUNCS_BY_DIMS = {
+    '1D': VORONOI_CORE_1D_FUNCS,
+    '2D': VORONOI_CORE_2D_FUNCS,
+    '3D': VORONOI_CORE_3D_FUNCS,
+    '4D': VORONOI_CORE_4D_FUNCS,
+}
+
+# Entry point -> (core functions, fractal functions) it calls
+_FX_DEPS = (('f1', 'smooth_f1', 'f2'), ('x_fx',))
+_ENTRY_DEPS = {
+    'f1': _FX_DEPS,
+    'smooth_f1': _FX_DEPS,
+    'f2': _FX_DEPS,
+    'distance_to_edge': (('distance_to_edge',), ('distance_to_edge',)),
+    'n_sphere_radius': (('n_sphere_radius',), ()),
+    'f1_nofractal': (('f1',), ()),
+    'smooth_f1_nofractal': (('f1', 'smooth_f1'), ()),
+    'f2_nofractal': (('f2',), ()),
+    'distance_to_edge_nofractal': (('distance_to_edge',), ()),
+}
+
+
+@lru_cache(maxsize=64)
+def get_voronoi_glsl(entries: frozenset) -> str:
+    """
+    Per-dimension Voronoi code for just the requested entry points.
+    
+    Args:
+        entries: frozenset of (dims, entry) pairs, e.g. ('3D', 'f1') or
+            ('2D', 'smooth_f1_nofractal'), naming node_tex_voronoi_* functions
+    
+    Returns:
+        Core, fractal and entry point functions needed by those entries, in
+        dependency order. Requires VORONOI_COMMON_GLSL and a distance bundle.
+    """
+    parts = []
+    for dims in ('1D', '2D', '3D', '4D'):
+        wanted = {entry for d, entry in entries if d == dims}
+        if not wanted:
+            continue
+        core, fractal = set(), set()
+        for entry in wanted:
+            core_deps, fractal_deps = _ENTRY_DEPS[entry]
+            core.update(core_deps)
+            fractal.update(fractal_deps)
+        parts.extend(code for name, code in _VORONOI_CORE_FUNCS_BY_DIMS[dims].items() if name in core)
+        parts.extend(code for name, code in VORONOI_FRACTAL_FUNCS[dims].items() if name in fractal)
+        parts.extend(code for name, code in VORONOI_TEX_FUNCS[dims].items() if name in wanted)
+    return ''.join(parts)
+
+
+# Combined VORONOI_GLSL constant for backward compatibility
+VORONOI_GLSL = VORONOI_COMMON_GLSL + VORONOI_DISTANCE_GLSL + ''.join(VORONOI_DIMENSION_GLSL.values())
+
 __all__ = [
     'SAFE_MATH_GLSL', 'VORONOI_DEFINES_GLSL', 'VORONOI_CORE_GLSL',
     'VORONOI_CORE_4D_GLSL', 'VORONOI_FRACTAL_GLSL', 'VORONOI_TEX_GLSL',
-    'VORONOI_GLSL'
+    'VORONOI_COMMON_GLSL', 'VORONOI_DIMENSION_GLSL',
+    'VORONOI_DISTANCE_GLSL', 'VORONOI_DISTANCE_METRIC_GLSL',
+    'VORONOI_GLSL', 'get_voronoi_glsl'
 ]
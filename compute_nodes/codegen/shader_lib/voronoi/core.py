@@ -23,7 +23,7 @@ VORONOI_DEFINES_GLSL = """
 #define FLT_MAX 3.402823466e+38
 """
 
-VORONOI_CORE_GLSL = """
+VORONOI_BASE_GLSL = """
 struct VoronoiParams {
   float scale;
   float detail;
@@ -42,6 +42,14 @@ struct VoronoiOutput {
   float3 Color;
   float4 Position;
 };
+float4 voronoi_position(float coord) { return float4(0.0f, 0.0f, 0.0f, coord); }
+float4 voronoi_position(float2 coord) { return float4(coord.x, coord.y, 0.0f, 0.0f); }
+float4 voronoi_position(float3 coord) { return float4(coord.x, coord.y, coord.z, 0.0f); }
+float4 voronoi_position(float4 coord) { return coord; }
+"""
+
+# voronoi_distance overloads dispatching on params.metric at runtime
+VORONOI_DISTANCE_GLSL = """
 float voronoi_distance(float a, float b, VoronoiParams params) { return abs(a - b); }
 float voronoi_distance(float2 a, float2 b, VoronoiParams params) {
   if (params.metric == SHD_VORONOI_EUCLIDEAN) return distance(a, b);
@@ -64,204 +72,286 @@ float voronoi_distance(float4 a, float4 b, VoronoiParams params) {
   else if (params.metric == SHD_VORONOI_MINKOWSKI) return pow(pow(abs(a.x - b.x), params.exponent) + pow(abs(a.y - b.y), params.exponent) + pow(abs(a.z - b.z), params.exponent) + pow(abs(a.w - b.w), params.exponent), 1.0f / params.exponent);
   else return 0.0f;
 }
+"""
 
-float4 voronoi_position(float coord) { return float4(0.0f, 0.0f, 0.0f, coord); }
-float4 voronoi_position(float2 coord) { return float4(coord.x, coord.y, 0.0f, 0.0f); }
-float4 voronoi_position(float3 coord) { return float4(coord.x, coord.y, coord.z, 0.0f); }
-float4 voronoi_position(float4 coord) { return coord; }
+# Metric-specialized voronoi_distance overloads: shipped instead of the generic
+# ones when every Voronoi op in a pass uses the same metric, so the metric
+# branch drops out of the cell loops.
+VORONOI_DISTANCE_METRIC_GLSL = {
+    'EUCLIDEAN': """
+float voronoi_distance(float a, float b, VoronoiParams params) { return abs(a - b); }
+float voronoi_distance(float2 a, float2 b, VoronoiParams params) { return distance(a, b); }
+float voronoi_distance(float3 a, float3 b, VoronoiParams params) { return distance(a, b); }
+float voronoi_distance(float4 a, float4 b, VoronoiParams params) { return distance(a, b); }
+""",
+    'MANHATTAN': """
+float voronoi_distance(float a, float b, VoronoiParams params) { return abs(a - b); }
+float voronoi_distance(float2 a, float2 b, VoronoiParams params) { float2 d = abs(a - b); return d.x + d.y; }
+float voronoi_distance(float3 a, float3 b, VoronoiParams params) { float3 d = abs(a - b); return d.x + d.y + d.z; }
+float voronoi_distance(float4 a, float4 b, VoronoiParams params) { float4 d = abs(a - b); return d.x + d.y + d.z + d.w; }
+""",
+    'CHEBYCHEV': """
+float voronoi_distance(float a, float b, VoronoiParams params) { return abs(a - b); }
+float voronoi_distance(float2 a, float2 b, VoronoiParams params) { float2 d = abs(a - b); return max(d.x, d.y); }
+float voronoi_distance(float3 a, float3 b, VoronoiParams params) { float3 d = abs(a - b); return max(d.x, max(d.y, d.z)); }
+float voronoi_distance(float4 a, float4 b, VoronoiParams params) { float4 d = abs(a - b); return max(d.x, max(d.y, max(d.z, d.w))); }
+""",
+    'MINKOWSKI': """
+float voronoi_distance(float a, float b, VoronoiParams params) { return abs(a - b); }
+float voronoi_distance(float2 a, float2 b, VoronoiParams params) { float2 d = pow(abs(a - b), float2(params.exponent)); return pow(d.x + d.y, 1.0f / params.exponent); }
+float voronoi_distance(float3 a, float3 b, VoronoiParams params) { float3 d = pow(abs(a - b), float3(params.exponent)); return pow(d.x + d.y + d.z, 1.0f / params.exponent); }
+float voronoi_distance(float4 a, float4 b, VoronoiParams params) { float4 d = pow(abs(a - b), float4(params.exponent)); return pow(d.x + d.y + d.z + d.w, 1.0f / params.exponent); }
+""",
+}
 
-// ---- 1D Voronoi ----
+# 1D core functions by feature (see get_voronoi_glsl for tree-shaking)
+VORONOI_CORE_1D_FUNCS = {
+    'f1': """
 VoronoiOutput voronoi_f1(VoronoiParams params, float coord) {
   float cellPosition_f = floor(coord); float localPosition = coord - cellPosition_f; int cellPosition = int(cellPosition_f);
   float minDistance = FLT_MAX; int targetOffset = 0; float targetPosition = 0.0f;
   for (int i = -1; i <= 1; i++) {
-        int cellOffset = i; float p = float(cellOffset) + hash_int_to_float(cellPosition + cellOffset) * params.randomness;
+        int cellOffset = i; float p = fma(hash_int_to_float(cellPosition + cellOffset), params.randomness, float(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
         if (d < minDistance) { targetOffset = cellOffset; minDistance = d; targetPosition = p; }
   }
   VoronoiOutput octave; octave.Distance = minDistance; octave.Color = hash_int_to_vec3(cellPosition + targetOffset); octave.Position = voronoi_position(targetPosition + cellPosition_f); return octave;
 }
+""",
+    'smooth_f1': """
 VoronoiOutput voronoi_smooth_f1(VoronoiParams params, float coord) {
   float cellPosition_f = floor(coord); float localPosition = coord - cellPosition_f; int cellPosition = int(cellPosition_f);
-  float smoothDistance = 0.0f; float3 smoothColor = float3(0.0f); float4 smoothPosition = float4(0.0f); float h = -1.0f;
-  for (int i = -2; i <= 2; i++) {
-        int cellOffset = i; float p = float(cellOffset) + hash_int_to_float(cellPosition + cellOffset) * params.randomness;
+  float inv_smoothness = 1.0f / max(params.smoothness, 1e-6f); float inv_norm = 1.0f / (1.0f + 3.0f * params.smoothness);
+  // First cell peeled out of the loop: its weight is always 1, so it just seeds the accumulators
+  int cellOffset0 = -2; float p0 = fma(hash_int_to_float(cellPosition + cellOffset0), params.randomness, float(cellOffset0));
+  float smoothDistance = voronoi_distance(p0, localPosition, params); float3 smoothColor = hash_int_to_vec3(cellPosition + cellOffset0); float smoothPosition = p0;
+  for (int n = 1; n < 5; n++) {
+        int cellOffset = n - 2; float p = fma(hash_int_to_float(cellPosition + cellOffset), params.randomness, float(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
-        h = h == -1.0f ? 1.0f : smoothstep(0.0f, 1.0f, 0.5f + 0.5f * (smoothDistance - d) / params.smoothness);
+        float t = clamp(0.5f + 0.5f * (smoothDistance - d) * inv_smoothness, 0.0f, 1.0f);
+        float h = t * t * (3.0f - 2.0f * t);
         float correctionFactor = params.smoothness * h * (1.0f - h);
-        smoothDistance = mix(smoothDistance, d, h) - correctionFactor; correctionFactor /= 1.0f + 3.0f * params.smoothness;
-        smoothColor = mix(smoothColor, hash_int_to_vec3(cellPosition + cellOffset), h) - correctionFactor;
-        smoothPosition = mix(smoothPosition, float4(0,0,0,p), h) - correctionFactor; 
+        smoothDistance = fma(h, d - smoothDistance, smoothDistance) - correctionFactor; correctionFactor *= inv_norm;
+        smoothColor = fma(float3(h), hash_int_to_vec3(cellPosition + cellOffset) - smoothColor, smoothColor) - correctionFactor;
+        smoothPosition = fma(h, p - smoothPosition, smoothPosition) - correctionFactor;
   }
-  VoronoiOutput octave; octave.Distance = smoothDistance; octave.Color = smoothColor; octave.Position = voronoi_position(cellPosition_f) + smoothPosition; return octave;
+  VoronoiOutput octave; octave.Distance = smoothDistance; octave.Color = smoothColor; octave.Position = voronoi_position(cellPosition_f + smoothPosition); return octave;
 }
+""",
+    'f2': """
 VoronoiOutput voronoi_f2(VoronoiParams params, float coord) {
   float cellPosition_f = floor(coord); float localPosition = coord - cellPosition_f; int cellPosition = int(cellPosition_f);
   float d1 = FLT_MAX; float d2 = FLT_MAX; int o1 = 0; float p1 = 0.0f; int o2 = 0; float p2 = 0.0f;
   for (int i = -1; i <= 1; i++) {
-        int cellOffset = i; float p = float(cellOffset) + hash_int_to_float(cellPosition + cellOffset) * params.randomness;
+        int cellOffset = i; float p = fma(hash_int_to_float(cellPosition + cellOffset), params.randomness, float(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
         if (d < d1) { d2 = d1; d1 = d; o2 = o1; o1 = cellOffset; p2 = p1; p1 = p; } else if (d < d2) { d2 = d; o2 = cellOffset; p2 = p; }
   }
   VoronoiOutput octave; octave.Distance = d2; octave.Color = hash_int_to_vec3(cellPosition + o2); octave.Position = voronoi_position(p2 + cellPosition_f); return octave;
 }
+""",
+    'distance_to_edge': """
 float voronoi_distance_to_edge(VoronoiParams params, float coord) {
   float cellPosition_f = floor(coord); float localPosition = coord - cellPosition_f; int cellPosition = int(cellPosition_f);
   float closest = 0.0f; float minD = FLT_MAX;
   for (int i = -1; i <= 1; i++) {
-          int cellOffset = i; float v = float(cellOffset) + hash_int_to_float(cellPosition + cellOffset) * params.randomness - localPosition;
+          int cellOffset = i; float v = fma(hash_int_to_float(cellPosition + cellOffset), params.randomness, float(cellOffset)) - localPosition;
           float d = v * v; if (d < minD) { minD = d; closest = v; }
   }
   minD = FLT_MAX;
   for (int i = -1; i <= 1; i++) {
-          int cellOffset = i; float v = float(cellOffset) + hash_int_to_float(cellPosition + cellOffset) * params.randomness - localPosition;
+          int cellOffset = i; float v = fma(hash_int_to_float(cellPosition + cellOffset), params.randomness, float(cellOffset)) - localPosition;
           float perp = v - closest; if (abs(perp) > 0.0001f) { float d = (closest + v) / 2.0f; minD = min(minD, abs(d)); }
   }
   return minD;
 }
+""",
+    'n_sphere_radius': """
 float voronoi_n_sphere_radius(VoronoiParams params, float coord) {
   float cellPosition_f = floor(coord); float localPosition = coord - cellPosition_f; int cellPosition = int(cellPosition_f);
   float closest = 0.0f; float minD = FLT_MAX; int closestOffset = 0;
   for (int i = -1; i <= 1; i++) {
-          int cellOffset = i; float p = float(cellOffset) + hash_int_to_float(cellPosition + cellOffset) * params.randomness;
+          int cellOffset = i; float p = fma(hash_int_to_float(cellPosition + cellOffset), params.randomness, float(cellOffset));
           float d = abs(p - localPosition); if (d < minD) { minD = d; closest = p; closestOffset = cellOffset; }
   }
   minD = FLT_MAX; float c2c = 0.0f;
   for (int i = -1; i <= 1; i++) {
            if (i == 0) continue;
-           int cellOffset = i + closestOffset; float p = float(cellOffset) + hash_int_to_float(cellPosition + cellOffset) * params.randomness;
+           int cellOffset = i + closestOffset; float p = fma(hash_int_to_float(cellPosition + cellOffset), params.randomness, float(cellOffset));
            float d = abs(closest - p); if (d < minD) { minD = d; c2c = p; }
   }
   return abs(c2c - closest) / 2.0f;
 }
+""",
+}
+
+VORONOI_CORE_1D_GLSL = "\n// ---- 1D Voronoi ----\n" + ''.join(VORONOI_CORE_1D_FUNCS.values())
 
-// ---- 2D Voronoi ----
+# 2D core functions by feature (see get_voronoi_glsl for tree-shaking)
+VORONOI_CORE_2D_FUNCS = {
+    'f1': """
 VoronoiOutput voronoi_f1(VoronoiParams params, float2 coord) {
   float2 cellPosition_f = floor(coord); float2 localPosition = coord - cellPosition_f; int2 cellPosition = int2(cellPosition_f);
   float minDistance = FLT_MAX; int2 targetOffset = int2(0); float2 targetPosition = float2(0.0f);
   for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int2 cellOffset = int2(i, j); float2 p = float2(cellOffset) + hash_int2_to_vec2(cellPosition + cellOffset) * params.randomness;
+        int2 cellOffset = int2(i, j); float2 p = fma(hash_int2_to_vec2(cellPosition + cellOffset), float2(params.randomness), float2(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
         if (d < minDistance) { targetOffset = cellOffset; minDistance = d; targetPosition = p; }
   }}
   VoronoiOutput octave; octave.Distance = minDistance; octave.Color = hash_int2_to_vec3(cellPosition + targetOffset); octave.Position = voronoi_position(targetPosition + cellPosition_f); return octave;
 }
+""",
+    'smooth_f1': """
 VoronoiOutput voronoi_smooth_f1(VoronoiParams params, float2 coord) {
   float2 cellPosition_f = floor(coord); float2 localPosition = coord - cellPosition_f; int2 cellPosition = int2(cellPosition_f);
-  float smoothDistance = 0.0f; float3 smoothColor = float3(0.0f); float4 smoothPosition = float4(0.0f); float h = -1.0f;
-  for (int j = -2; j <= 2; j++) { for (int i = -2; i <= 2; i++) {
-        int2 cellOffset = int2(i, j); float2 p = float2(cellOffset) + hash_int2_to_vec2(cellPosition + cellOffset) * params.randomness;
+  float inv_smoothness = 1.0f / max(params.smoothness, 1e-6f); float inv_norm = 1.0f / (1.0f + 3.0f * params.smoothness);
+  // First cell peeled out of the loop: its weight is always 1, so it just seeds the accumulators
+  int2 cellOffset0 = int2(-2); float2 p0 = fma(hash_int2_to_vec2(cellPosition + cellOffset0), float2(params.randomness), float2(cellOffset0));
+  float smoothDistance = voronoi_distance(p0, localPosition, params); float3 smoothColor = hash_int2_to_vec3(cellPosition + cellOffset0); float2 smoothPosition = p0;
+  for (int n = 1; n < 25; n++) {
+        int2 cellOffset = int2(n % 5, n / 5) - 2; float2 p = fma(hash_int2_to_vec2(cellPosition + cellOffset), float2(params.randomness), float2(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
-        h = h == -1.0f ? 1.0f : smoothstep(0.0f, 1.0f, 0.5f + 0.5f * (smoothDistance - d) / params.smoothness);
+        float t = clamp(0.5f + 0.5f * (smoothDistance - d) * inv_smoothness, 0.0f, 1.0f);
+        float h = t * t * (3.0f - 2.0f * t);
         float correctionFactor = params.smoothness * h * (1.0f - h);
-        smoothDistance = mix(smoothDistance, d, h) - correctionFactor; correctionFactor /= 1.0f + 3.0f * params.smoothness;
-        smoothColor = mix(smoothColor, hash_int2_to_vec3(cellPosition + cellOffset), h) - correctionFactor;
-        smoothPosition = mix(smoothPosition, float4(p, 0.0, 0.0), h) - correctionFactor;
-  }}
-  VoronoiOutput octave; octave.Distance = smoothDistance; octave.Color = smoothColor; octave.Position = voronoi_position(cellPosition_f) + smoothPosition; return octave;
+        smoothDistance = fma(h, d - smoothDistance, smoothDistance) - correctionFactor; correctionFactor *= inv_norm;
+        smoothColor = fma(float3(h), hash_int2_to_vec3(cellPosition + cellOffset) - smoothColor, smoothColor) - correctionFactor;
+        smoothPosition = fma(float2(h), p - smoothPosition, smoothPosition) - correctionFactor;
+  }
+  VoronoiOutput octave; octave.Distance = smoothDistance; octave.Color = smoothColor; octave.Position = voronoi_position(cellPosition_f + smoothPosition); return octave;
 }
+""",
+    'f2': """
 VoronoiOutput voronoi_f2(VoronoiParams params, float2 coord) {
   float2 cellPosition_f = floor(coord); float2 localPosition = coord - cellPosition_f; int2 cellPosition = int2(cellPosition_f);
   float d1 = FLT_MAX; float d2 = FLT_MAX; int2 o1 = int2(0); float2 p1 = float2(0.0f); int2 o2 = int2(0); float2 p2 = float2(0.0f);
   for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int2 cellOffset = int2(i, j); float2 p = float2(cellOffset) + hash_int2_to_vec2(cellPosition + cellOffset) * params.randomness;
+        int2 cellOffset = int2(i, j); float2 p = fma(hash_int2_to_vec2(cellPosition + cellOffset), float2(params.randomness), float2(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
         if (d < d1) { d2 = d1; d1 = d; o2 = o1; o1 = cellOffset; p2 = p1; p1 = p; } else if (d < d2) { d2 = d; o2 = cellOffset; p2 = p; }
   }}
   VoronoiOutput octave; octave.Distance = d2; octave.Color = hash_int2_to_vec3(cellPosition + o2); octave.Position = voronoi_position(p2 + cellPosition_f); return octave;
 }
+""",
+    'distance_to_edge': """
 float voronoi_distance_to_edge(VoronoiParams params, float2 coord) {
   float2 cellPosition_f = floor(coord); float2 localPosition = coord - cellPosition_f; int2 cellPosition = int2(cellPosition_f);
   float2 closest = float2(0.0f); float minD = FLT_MAX;
   for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-          int2 cellOffset = int2(i, j); float2 v = float2(cellOffset) + hash_int2_to_vec2(cellPosition + cellOffset) * params.randomness - localPosition;
+          int2 cellOffset = int2(i, j); float2 v = fma(hash_int2_to_vec2(cellPosition + cellOffset), float2(params.randomness), float2(cellOffset)) - localPosition;
           float d = dot(v, v); if (d < minD) { minD = d; closest = v; }
   }}
   minD = FLT_MAX;
   for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-          int2 cellOffset = int2(i, j); float2 v = float2(cellOffset) + hash_int2_to_vec2(cellPosition + cellOffset) * params.randomness - localPosition;
-          float2 perp = v - closest; if (dot(perp, perp) > 0.0001f) { float d = dot((closest + v) / 2.0f, normalize(perp)); minD = min(minD, d); }
+          int2 cellOffset = int2(i, j); float2 v = fma(hash_int2_to_vec2(cellPosition + cellOffset), float2(params.randomness), float2(cellOffset)) - localPosition;
+          float2 perp = v - closest; float pp = dot(perp, perp); if (pp > 0.0001f) { float d = dot((closest + v) * 0.5f, perp) * inversesqrt(pp); minD = min(minD, d); }
   }}
   return minD;
 }
+""",
+    'n_sphere_radius': """
 float voronoi_n_sphere_radius(VoronoiParams params, float2 coord) {
   float2 cellPosition_f = floor(coord); float2 localPosition = coord - cellPosition_f; int2 cellPosition = int2(cellPosition_f);
   float2 closest = float2(0.0f); float minD = FLT_MAX; int2 closestOffset = int2(0);
   for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-          int2 cellOffset = int2(i, j); float2 p = float2(cellOffset) + hash_int2_to_vec2(cellPosition + cellOffset) * params.randomness;
+          int2 cellOffset = int2(i, j); float2 p = fma(hash_int2_to_vec2(cellPosition + cellOffset), float2(params.randomness), float2(cellOffset));
           float d = distance(p, localPosition); if (d < minD) { minD = d; closest = p; closestOffset = cellOffset; }
   }}
   minD = FLT_MAX; float2 c2c = float2(0.0f);
   for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
            if (i == 0 && j == 0) continue;
-           int2 cellOffset = int2(i, j) + closestOffset; float2 p = float2(cellOffset) + hash_int2_to_vec2(cellPosition + cellOffset) * params.randomness;
+           int2 cellOffset = int2(i, j) + closestOffset; float2 p = fma(hash_int2_to_vec2(cellPosition + cellOffset), float2(params.randomness), float2(cellOffset));
            float d = distance(closest, p); if (d < minD) { minD = d; c2c = p; }
   }}
   return distance(c2c, closest) / 2.0f;
 }
+""",
+}
 
-// ---- 3D Voronoi ----
+VORONOI_CORE_2D_GLSL = "\n// ---- 2D Voronoi ----\n" + ''.join(VORONOI_CORE_2D_FUNCS.values())
+
+# 3D core functions by feature (see get_voronoi_glsl for tree-shaking)
+VORONOI_CORE_3D_FUNCS = {
+    'f1': """
 VoronoiOutput voronoi_f1(VoronoiParams params, float3 coord) {
   float3 cellPosition_f = floor(coord); float3 localPosition = coord - cellPosition_f; int3 cellPosition = int3(cellPosition_f);
   float minDistance = FLT_MAX; int3 targetOffset = int3(0); float3 targetPosition = float3(0.0f);
   for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int3 cellOffset = int3(i, j, k); float3 pointPosition = float3(cellOffset) + hash_int3_to_vec3(cellPosition + cellOffset) * params.randomness;
+        int3 cellOffset = int3(i, j, k); float3 pointPosition = fma(hash_int3_to_vec3(cellPosition + cellOffset), float3(params.randomness), float3(cellOffset));
         float distanceToPoint = voronoi_distance(pointPosition, localPosition, params);
         if (distanceToPoint < minDistance) { targetOffset = cellOffset; minDistance = distanceToPoint; targetPosition = pointPosition; }
   }}}
   VoronoiOutput octave; octave.Distance = minDistance; octave.Color = hash_int3_to_vec3(cellPosition + targetOffset); octave.Position = voronoi_position(targetPosition + cellPosition_f); return octave;
 }
+""",
+    'smooth_f1': """
 VoronoiOutput voronoi_smooth_f1(VoronoiParams params, float3 coord) {
   float3 cellPosition_f = floor(coord); float3 localPosition = coord - cellPosition_f; int3 cellPosition = int3(cellPosition_f);
-  float smoothDistance = 0.0f; float3 smoothColor = float3(0.0f); float4 smoothPosition = float4(0.0f); float h = -1.0f;
-  for (int k = -2; k <= 2; k++) { for (int j = -2; j <= 2; j++) { for (int i = -2; i <= 2; i++) {
-        int3 cellOffset = int3(i, j, k); float3 p = float3(cellOffset) + hash_int3_to_vec3(cellPosition + cellOffset) * params.randomness;
+  float inv_smoothness = 1.0f / max(params.smoothness, 1e-6f); float inv_norm = 1.0f / (1.0f + 3.0f * params.smoothness);
+  // First cell peeled out of the loop: its weight is always 1, so it just seeds the accumulators
+  int3 cellOffset0 = int3(-2); float3 p0 = fma(hash_int3_to_vec3(cellPosition + cellOffset0), float3(params.randomness), float3(cellOffset0));
+  float smoothDistance = voronoi_distance(p0, localPosition, params); float3 smoothColor = hash_int3_to_vec3(cellPosition + cellOffset0); float3 smoothPosition = p0;
+  for (int n = 1; n < 125; n++) {
+        int3 cellOffset = int3(n % 5, (n / 5) % 5, n / 25) - 2; float3 p = fma(hash_int3_to_vec3(cellPosition + cellOffset), float3(params.randomness), float3(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
-        h = h == -1.0f ? 1.0f : smoothstep(0.0f, 1.0f, 0.5f + 0.5f * (smoothDistance - d) / params.smoothness);
+        float t = clamp(0.5f + 0.5f * (smoothDistance - d) * inv_smoothness, 0.0f, 1.0f);
+        float h = t * t * (3.0f - 2.0f * t);
         float correctionFactor = params.smoothness * h * (1.0f - h);
-        smoothDistance = mix(smoothDistance, d, h) - correctionFactor; correctionFactor /= 1.0f + 3.0f * params.smoothness;
-        smoothColor = mix(smoothColor, hash_int3_to_vec3(cellPosition + cellOffset), h) - correctionFactor;
-        smoothPosition = mix(smoothPosition, float4(p, 0.0f), h) - correctionFactor;
-  }}}
-  VoronoiOutput octave; octave.Distance = smoothDistance; octave.Color = smoothColor; octave.Position = voronoi_position(cellPosition_f) + smoothPosition; return octave;
+        smoothDistance = fma(h, d - smoothDistance, smoothDistance) - correctionFactor; correctionFactor *= inv_norm;
+        smoothColor = fma(float3(h), hash_int3_to_vec3(cellPosition + cellOffset) - smoothColor, smoothColor) - correctionFactor;
+        smoothPosition = fma(float3(h), p - smoothPosition, smoothPosition) - correctionFactor;
+  }
+  VoronoiOutput octave; octave.Distance = smoothDistance; octave.Color = smoothColor; octave.Position = voronoi_position(cellPosition_f + smoothPosition); return octave;
 }
+""",
+    'f2': """
 VoronoiOutput voronoi_f2(VoronoiParams params, float3 coord) {
   float3 cellPosition_f = floor(coord); float3 localPosition = coord - cellPosition_f; int3 cellPosition = int3(cellPosition_f);
   float d1 = FLT_MAX; float d2 = FLT_MAX; int3 o1 = int3(0); float3 p1 = float3(0.0f); int3 o2 = int3(0); float3 p2 = float3(0.0f);
   for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int3 cellOffset = int3(i, j, k); float3 p = float3(cellOffset) + hash_int3_to_vec3(cellPosition + cellOffset) * params.randomness;
+        int3 cellOffset = int3(i, j, k); float3 p = fma(hash_int3_to_vec3(cellPosition + cellOffset), float3(params.randomness), float3(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
         if (d < d1) { d2 = d1; d1 = d; o2 = o1; o1 = cellOffset; p2 = p1; p1 = p; } else if (d < d2) { d2 = d; o2 = cellOffset; p2 = p; }
   }}}
   VoronoiOutput octave; octave.Distance = d2; octave.Color = hash_int3_to_vec3(cellPosition + o2); octave.Position = voronoi_position(p2 + cellPosition_f); return octave;
 }
+""",
+    'distance_to_edge': """
 float voronoi_distance_to_edge(VoronoiParams params, float3 coord) {
   float3 cellPosition_f = floor(coord); float3 localPosition = coord - cellPosition_f; int3 cellPosition = int3(cellPosition_f);
   float3 closest = float3(0.0f); float minD = FLT_MAX;
   for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int3 cellOffset = int3(i, j, k); float3 v = float3(cellOffset) + hash_int3_to_vec3(cellPosition + cellOffset) * params.randomness - localPosition;
+        int3 cellOffset = int3(i, j, k); float3 v = fma(hash_int3_to_vec3(cellPosition + cellOffset), float3(params.randomness), float3(cellOffset)) - localPosition;
         float d = dot(v, v); if (d < minD) { minD = d; closest = v; }
   }}}
   minD = FLT_MAX;
   for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int3 cellOffset = int3(i, j, k); float3 v = float3(cellOffset) + hash_int3_to_vec3(cellPosition + cellOffset) * params.randomness - localPosition;
-        float3 perp = v - closest; if (dot(perp, perp) > 0.0001f) { float d = dot((closest + v) / 2.0f, normalize(perp)); minD = min(minD, d); }
+        int3 cellOffset = int3(i, j, k); float3 v = fma(hash_int3_to_vec3(cellPosition + cellOffset), float3(params.randomness), float3(cellOffset)) - localPosition;
+        float3 perp = v - closest; float pp = dot(perp, perp); if (pp > 0.0001f) { float d = dot((closest + v) * 0.5f, perp) * inversesqrt(pp); minD = min(minD, d); }
   }}}
   return minD;
 }
+""",
+    'n_sphere_radius': """
 float voronoi_n_sphere_radius(VoronoiParams params, float3 coord) {
   float3 cellPosition_f = floor(coord); float3 localPosition = coord - cellPosition_f; int3 cellPosition = int3(cellPosition_f);
   float3 closest = float3(0.0f); float minD = FLT_MAX; int3 closestOffset = int3(0);
   for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int3 cellOffset = int3(i, j, k); float3 p = float3(cellOffset) + hash_int3_to_vec3(cellPosition + cellOffset) * params.randomness;
+        int3 cellOffset = int3(i, j, k); float3 p = fma(hash_int3_to_vec3(cellPosition + cellOffset), float3(params.randomness), float3(cellOffset));
         float d = distance(p, localPosition); if (d < minD) { minD = d; closest = p; closestOffset = cellOffset; }
   }}}
   minD = FLT_MAX; float3 c2c = float3(0.0f);
   for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
         if (i == 0 && j == 0 && k == 0) continue;
-        int3 cellOffset = int3(i, j, k) + closestOffset; float3 p = float3(cellOffset) + hash_int3_to_vec3(cellPosition + cellOffset) * params.randomness;
+        int3 cellOffset = int3(i, j, k) + closestOffset; float3 p = fma(hash_int3_to_vec3(cellPosition + cellOffset), float3(params.randomness), float3(cellOffset));
         float d = distance(closest, p); if (d < minD) { minD = d; c2c = p; }
   }}}
   return distance(c2c, closest) / 2.0f;
 }
-"""
+""",
+}
+
+VORONOI_CORE_3D_GLSL = "\n// ---- 3D Voronoi ----\n" + ''.join(VORONOI_CORE_3D_FUNCS.values())
+
+# Combined 1D-3D core (4D lives in core_4d.py)
+VORONOI_CORE_GLSL = VORONOI_BASE_GLSL + VORONOI_DISTANCE_GLSL + VORONOI_CORE_1D_GLSL + VORONOI_CORE_2D_GLSL + VORONOI_CORE_3D_GLSL
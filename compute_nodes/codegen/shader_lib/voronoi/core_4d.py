@@ -1,69 +1,85 @@
 # Voronoi 4D GLSL Functions
 # 4D variants are separate due to their size
 
-VORONOI_CORE_4D_GLSL = """
-// ---- 4D Voronoi ----
+# 4D core functions by feature (see get_voronoi_glsl for tree-shaking)
+VORONOI_CORE_4D_FUNCS = {
+    'f1': """
 VoronoiOutput voronoi_f1(VoronoiParams params, float4 coord) {
-  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f);
+  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f); int4 cellHash = hash_int4_precompute(cellPosition);
   float minDistance = FLT_MAX; int4 targetOffset = int4(0); float4 targetPosition = float4(0.0f);
   for (int u = -1; u <= 1; u++) { for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int4 cellOffset = int4(i, j, k, u); float4 p = float4(cellOffset) + hash_int4_to_vec4(cellPosition + cellOffset) * params.randomness;
+        int4 cellOffset = int4(i, j, k, u); float4 p = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset), float4(params.randomness), float4(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
         if (d < minDistance) { targetOffset = cellOffset; minDistance = d; targetPosition = p; }
   }}}}
-  VoronoiOutput octave; octave.Distance = minDistance; octave.Color = hash_int4_to_vec3(cellPosition + targetOffset); octave.Position = voronoi_position(targetPosition + cellPosition_f); return octave;
+  VoronoiOutput octave; octave.Distance = minDistance; octave.Color = hash_int4_finalize_to_vec3(cellHash, targetOffset); octave.Position = voronoi_position(targetPosition + cellPosition_f); return octave;
 }
+""",
+    'smooth_f1': """
 VoronoiOutput voronoi_smooth_f1(VoronoiParams params, float4 coord) {
-  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f);
-  float smoothDistance = 0.0f; float3 smoothColor = float3(0.0f); float4 smoothPosition = float4(0.0f); float h = -1.0f;
-  for (int u = -2; u <= 2; u++) { for (int k = -2; k <= 2; k++) { for (int j = -2; j <= 2; j++) { for (int i = -2; i <= 2; i++) {
-        int4 cellOffset = int4(i, j, k, u); float4 p = float4(cellOffset) + hash_int4_to_vec4(cellPosition + cellOffset) * params.randomness;
+  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f); int4 cellHash = hash_int4_precompute(cellPosition);
+  float inv_smoothness = 1.0f / max(params.smoothness, 1e-6f); float inv_norm = 1.0f / (1.0f + 3.0f * params.smoothness);
+  // First cell peeled out of the loop: its weight is always 1, so it just seeds the accumulators
+  int4 cellOffset0 = int4(-2); float4 p0 = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset0), float4(params.randomness), float4(cellOffset0));
+  float smoothDistance = voronoi_distance(p0, localPosition, params); float3 smoothColor = hash_int4_finalize_to_vec3(cellHash, cellOffset0); float4 smoothPosition = p0;
+  for (int n = 1; n < 625; n++) {
+        int4 cellOffset = int4(n % 5, (n / 5) % 5, (n / 25) % 5, n / 125) - 2; float4 p = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset), float4(params.randomness), float4(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
-        h = h == -1.0f ? 1.0f : smoothstep(0.0f, 1.0f, 0.5f + 0.5f * (smoothDistance - d) / params.smoothness);
+        float t = clamp(0.5f + 0.5f * (smoothDistance - d) * inv_smoothness, 0.0f, 1.0f);
+        float h = t * t * (3.0f - 2.0f * t);
         float correctionFactor = params.smoothness * h * (1.0f - h);
-        smoothDistance = mix(smoothDistance, d, h) - correctionFactor; correctionFactor /= 1.0f + 3.0f * params.smoothness;
-        smoothColor = mix(smoothColor, hash_int4_to_vec3(cellPosition + cellOffset), h) - correctionFactor;
-        smoothPosition = mix(smoothPosition, p, h) - correctionFactor;
-  }}}}
+        smoothDistance = fma(h, d - smoothDistance, smoothDistance) - correctionFactor; correctionFactor *= inv_norm;
+        smoothColor = fma(float3(h), hash_int4_finalize_to_vec3(cellHash, cellOffset) - smoothColor, smoothColor) - correctionFactor;
+        smoothPosition = fma(float4(h), p - smoothPosition, smoothPosition) - correctionFactor;
+  }
   VoronoiOutput octave; octave.Distance = smoothDistance; octave.Color = smoothColor; octave.Position = voronoi_position(cellPosition_f + smoothPosition); return octave;
 }
+""",
+    'f2': """
 VoronoiOutput voronoi_f2(VoronoiParams params, float4 coord) {
-  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f);
+  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f); int4 cellHash = hash_int4_precompute(cellPosition);
   float d1 = FLT_MAX; float d2 = FLT_MAX; int4 o1 = int4(0); float4 p1 = float4(0.0f); int4 o2 = int4(0); float4 p2 = float4(0.0f);
   for (int u = -1; u <= 1; u++) { for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-        int4 cellOffset = int4(i, j, k, u); float4 p = float4(cellOffset) + hash_int4_to_vec4(cellPosition + cellOffset) * params.randomness;
+        int4 cellOffset = int4(i, j, k, u); float4 p = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset), float4(params.randomness), float4(cellOffset));
         float d = voronoi_distance(p, localPosition, params);
         if (d < d1) { d2 = d1; d1 = d; o2 = o1; o1 = cellOffset; p2 = p1; p1 = p; } else if (d < d2) { d2 = d; o2 = cellOffset; p2 = p; }
   }}}}
-  VoronoiOutput octave; octave.Distance = d2; octave.Color = hash_int4_to_vec3(cellPosition + o2); octave.Position = voronoi_position(p2 + cellPosition_f); return octave;
+  VoronoiOutput octave; octave.Distance = d2; octave.Color = hash_int4_finalize_to_vec3(cellHash, o2); octave.Position = voronoi_position(p2 + cellPosition_f); return octave;
 }
+""",
+    'distance_to_edge': """
 float voronoi_distance_to_edge(VoronoiParams params, float4 coord) {
-  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f);
+  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f); int4 cellHash = hash_int4_precompute(cellPosition);
   float4 closest = float4(0.0f); float minD = FLT_MAX;
   for (int u = -1; u <= 1; u++) { for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-          int4 cellOffset = int4(i, j, k, u); float4 v = float4(cellOffset) + hash_int4_to_vec4(cellPosition + cellOffset) * params.randomness - localPosition;
+          int4 cellOffset = int4(i, j, k, u); float4 v = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset), float4(params.randomness), float4(cellOffset)) - localPosition;
           float d = dot(v, v); if (d < minD) { minD = d; closest = v; }
   }}}}
   minD = FLT_MAX;
   for (int u = -1; u <= 1; u++) { for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-          int4 cellOffset = int4(i, j, k, u); float4 v = float4(cellOffset) + hash_int4_to_vec4(cellPosition + cellOffset) * params.randomness - localPosition;
-          float4 perp = v - closest; if (dot(perp, perp) > 0.0001f) { float d = dot((closest + v) / 2.0f, normalize(perp)); minD = min(minD, d); }
+          int4 cellOffset = int4(i, j, k, u); float4 v = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset), float4(params.randomness), float4(cellOffset)) - localPosition;
+          float4 perp = v - closest; float pp = dot(perp, perp); if (pp > 0.0001f) { float d = dot((closest + v) * 0.5f, perp) * inversesqrt(pp); minD = min(minD, d); }
   }}}}
   return minD;
 }
+""",
+    'n_sphere_radius': """
 float voronoi_n_sphere_radius(VoronoiParams params, float4 coord) {
-  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f);
+  float4 cellPosition_f = floor(coord); float4 localPosition = coord - cellPosition_f; int4 cellPosition = int4(cellPosition_f); int4 cellHash = hash_int4_precompute(cellPosition);
   float4 closest = float4(0.0f); float minD = FLT_MAX; int4 closestOffset = int4(0);
   for (int u = -1; u <= 1; u++) { for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
-          int4 cellOffset = int4(i, j, k, u); float4 p = float4(cellOffset) + hash_int4_to_vec4(cellPosition + cellOffset) * params.randomness;
+          int4 cellOffset = int4(i, j, k, u); float4 p = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset), float4(params.randomness), float4(cellOffset));
           float d = distance(p, localPosition); if (d < minD) { minD = d; closest = p; closestOffset = cellOffset; }
   }}}}
   minD = FLT_MAX; float4 c2c = float4(0.0f);
   for (int u = -1; u <= 1; u++) { for (int k = -1; k <= 1; k++) { for (int j = -1; j <= 1; j++) { for (int i = -1; i <= 1; i++) {
            if (i == 0 && j == 0 && k == 0 && u == 0) continue;
-           int4 cellOffset = int4(i, j, k, u) + closestOffset; float4 p = float4(cellOffset) + hash_int4_to_vec4(cellPosition + cellOffset) * params.randomness;
+           int4 cellOffset = int4(i, j, k, u) + closestOffset; float4 p = fma(hash_int4_finalize_to_vec4(cellHash, cellOffset), float4(params.randomness), float4(cellOffset));
            float d = distance(closest, p); if (d < minD) { minD = d; c2c = p; }
   }}}}
   return distance(c2c, closest) / 2.0f;
 }
-"""
+""",
+}
+
+VORONOI_CORE_4D_GLSL = "\n// ---- 4D Voronoi ----\n" + ''.join(VORONOI_CORE_4D_FUNCS.values())
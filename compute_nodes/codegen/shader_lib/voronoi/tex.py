@@ -1,58 +1,145 @@
 # Voronoi Texture Node GLSL Functions
 
-VORONOI_TEX_GLSL = """
-# define INITIALIZE_VORONOIPARAMS(FEATURE) \\
-  params.feature = FEATURE; params.metric = int(metric); params.scale = scale; params.detail = clamp(detail, 0.0f, 15.0f); \\
-  params.roughness = clamp(roughness, 0.0f, 1.0f); params.lacunarity = lacunarity; params.smoothness = clamp(smoothness / 2.0f, 0.0f, 0.5f); \\
-  params.exponent = exponent; params.randomness = clamp(randomness, 0.0f, 1.0f); params.max_distance = 0.0f; params.normalize = bool(normalize);
-
-#define DEFINE_NODE_TEX_VORONOI(dims, T, SUFFIX) \\
-void node_tex_voronoi_f1_##SUFFIX(T coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, \\
-                            float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) { \\
-  VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_F1) \\
-  coord *= scale; \\
-  params.max_distance = voronoi_distance(T(0.0f), T(0.5f + 0.5f * params.randomness), params); \\
-  VoronoiOutput Output = fractal_voronoi_x_fx(params, coord); \\
-  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz; \\
-} \\
-void node_tex_voronoi_smooth_f1_##SUFFIX(T coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, \\
-                                   float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) { \\
-  VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_SMOOTH_F1) \\
-  coord *= scale; \\
-  params.max_distance = voronoi_distance(T(0.0f), T(0.5f + 0.5f * params.randomness), params); \\
-  VoronoiOutput Output = fractal_voronoi_x_fx(params, coord); \\
-  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz; \\
-} \\
-void node_tex_voronoi_f2_##SUFFIX(T coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, \\
-                            float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) { \\
-  VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_F2) \\
-  coord *= scale; \\
-  params.max_distance = voronoi_distance(T(0.0f), T(0.5f + 0.5f * params.randomness), params) * 2.0f; \\
-  VoronoiOutput Output = fractal_voronoi_x_fx(params, coord); \\
-  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz; \\
-} \\
-void node_tex_voronoi_distance_to_edge_##SUFFIX(T coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, \\
-                                          float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) { \\
-  VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_DISTANCE_TO_EDGE) \\
-  coord *= scale; \\
-  params.max_distance = 0.5f + 0.5f * params.randomness; \\
-  outDistance = fractal_voronoi_distance_to_edge(params, coord); \\
-} \\
-void node_tex_voronoi_n_sphere_radius_##SUFFIX(T coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, \\
-                                         float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) { \\
-  VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_N_SPHERE_RADIUS) \\
-  coord *= scale; \\
-  outRadius = voronoi_n_sphere_radius(params, coord); \\
-}
-
-DEFINE_NODE_TEX_VORONOI(1D, float, 1d)
-DEFINE_NODE_TEX_VORONOI(2D, float2, 2d)
-DEFINE_NODE_TEX_VORONOI(3D, float3, 3d)
-
-// 4D Wrapper handling (vec3 + w -> float4)
-void node_tex_voronoi_f1_4d(float3 coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {   VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_F1)   float4 p = float4(coord, w) * scale;   params.max_distance = voronoi_distance(float4(0.0f), float4(0.5f + 0.5f * params.randomness), params);   VoronoiOutput Output = fractal_voronoi_x_fx(params, p);   outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz; }
-void node_tex_voronoi_smooth_f1_4d(float3 coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {   VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_SMOOTH_F1)   float4 p = float4(coord, w) * scale;   params.max_distance = voronoi_distance(float4(0.0f), float4(0.5f + 0.5f * params.randomness), params);   VoronoiOutput Output = fractal_voronoi_x_fx(params, p);   outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz; }
-void node_tex_voronoi_f2_4d(float3 coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {   VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_F2)   float4 p = float4(coord, w) * scale;   params.max_distance = voronoi_distance(float4(0.0f), float4(0.5f + 0.5f * params.randomness), params) * 2.0f;   VoronoiOutput Output = fractal_voronoi_x_fx(params, p);   outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz; }
-void node_tex_voronoi_distance_to_edge_4d(float3 coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {   VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_DISTANCE_TO_EDGE)   float4 p = float4(coord, w) * scale;   params.max_distance = 0.5f + 0.5f * params.randomness;   outDistance = fractal_voronoi_distance_to_edge(params, p); }
-void node_tex_voronoi_n_sphere_radius_4d(float3 coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent, float randomness, float metric, float normalize, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {   VoronoiParams params; INITIALIZE_VORONOIPARAMS(SHD_VORONOI_N_SPHERE_RADIUS)   float4 p = float4(coord, w) * scale;   outRadius = voronoi_n_sphere_radius(params, p); }
-"""
+from string import Template
+
+# Entry points are specialized per dimension in Python rather than through
+# #define macros, so the driver parses plain functions with nothing left to expand.
+#   $CoordT       type of the coord argument (float3 + w for 4D)
+#   $T            Voronoi coordinate type
+#   $SUFFIX       dimension suffix of the function names
+#   $SCALED_COORD expression building the scaled $T coordinate
+#   $MAX_DISTANCE max_distance expression (see _max_distance)
+
+_INITIALIZE_VORONOIPARAMS = Template(
+    "VoronoiParams params; "
+    "params.feature = $FEATURE; params.metric = int(metric); params.scale = scale; params.detail = clamp(detail, 0.0f, 15.0f);\n"
+    "  params.roughness = clamp(roughness, 0.0f, 1.0f); params.lacunarity = lacunarity; params.smoothness = clamp(smoothness / 2.0f, 0.0f, 0.5f);\n"
+    "  params.exponent = exponent; params.randomness = clamp(randomness, 0.0f, 1.0f); params.max_distance = 0.0f; params.normalize = bool(normalize);"
+)
+
+_NODE_TEX_VORONOI = {
+    'f1': Template("""
+void node_tex_voronoi_f1_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                            float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_F1
+  $T p = $SCALED_COORD;
+  params.max_distance = $MAX_DISTANCE;
+  VoronoiOutput Output = fractal_voronoi_x_fx(params, p);
+  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz;
+}
+"""),
+    'smooth_f1': Template("""
+void node_tex_voronoi_smooth_f1_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                                   float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_SMOOTH_F1
+  $T p = $SCALED_COORD;
+  params.max_distance = $MAX_DISTANCE;
+  VoronoiOutput Output = fractal_voronoi_x_fx(params, p);
+  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz;
+}
+"""),
+    'f2': Template("""
+void node_tex_voronoi_f2_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                            float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_F2
+  $T p = $SCALED_COORD;
+  params.max_distance = $MAX_DISTANCE * 2.0f;
+  VoronoiOutput Output = fractal_voronoi_x_fx(params, p);
+  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = Output.Position.xyz;
+}
+"""),
+    'distance_to_edge': Template("""
+void node_tex_voronoi_distance_to_edge_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                                          float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_DISTANCE_TO_EDGE
+  $T p = $SCALED_COORD;
+  params.max_distance = 0.5f + 0.5f * params.randomness;
+  outDistance = fractal_voronoi_distance_to_edge(params, p);
+}
+"""),
+    'n_sphere_radius': Template("""
+void node_tex_voronoi_n_sphere_radius_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                                         float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_N_SPHERE_RADIUS
+  $T p = $SCALED_COORD;
+  outRadius = voronoi_n_sphere_radius(params, p);
+}
+"""),
+}
+
+# Non-fractal specializations: selected by the emitter when Detail or Roughness
+# is a compile-time zero, so fractal_voronoi_* would only ever run one octave.
+_NODE_TEX_VORONOI_NOFRACTAL = {
+    'f1': Template("""
+void node_tex_voronoi_f1_nofractal_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                                      float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_F1
+  $T p = $SCALED_COORD;
+  VoronoiOutput Output = voronoi_f1(params, p);
+  if (params.normalize) Output.Distance /= $MAX_DISTANCE;
+  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = safe_divide(Output.Position, params.scale).xyz;
+}
+"""),
+    'smooth_f1': Template("""
+void node_tex_voronoi_smooth_f1_nofractal_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                                             float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_SMOOTH_F1
+  $T p = $SCALED_COORD;
+  VoronoiOutput Output = (params.smoothness != 0.0f) ? voronoi_smooth_f1(params, p) : voronoi_f1(params, p);
+  if (params.normalize) Output.Distance /= $MAX_DISTANCE;
+  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = safe_divide(Output.Position, params.scale).xyz;
+}
+"""),
+    'f2': Template("""
+void node_tex_voronoi_f2_nofractal_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                                      float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_F2
+  $T p = $SCALED_COORD;
+  VoronoiOutput Output = voronoi_f2(params, p);
+  if (params.normalize) Output.Distance /= $MAX_DISTANCE * 2.0f;
+  outDistance = Output.Distance; outColor = float4(Output.Color, 1.0f); outPosition = safe_divide(Output.Position, params.scale).xyz;
+}
+"""),
+    'distance_to_edge': Template("""
+void node_tex_voronoi_distance_to_edge_nofractal_$SUFFIX($CoordT coord, float w, float scale, float detail, float roughness, float lacunarity, float smoothness, float exponent,
+                                                    float randomness, float metric, float normalize, float max_distance, out float outDistance, out float4 outColor, out float3 outPosition, out float outW, out float outRadius) {
+  $INIT_DISTANCE_TO_EDGE
+  $T p = $SCALED_COORD;
+  outDistance = voronoi_distance_to_edge(params, p);
+  if (params.normalize) outDistance /= 0.5f + 0.5f * params.randomness;
+}
+"""),
+}
+
+_INIT_PARAMS = {
+    f"INIT_{feature}": _INITIALIZE_VORONOIPARAMS.substitute(FEATURE=f"SHD_VORONOI_{feature}")
+    for feature in ('F1', 'SMOOTH_F1', 'F2', 'DISTANCE_TO_EDGE', 'N_SPHERE_RADIUS')
+}
+
+
+def _max_distance(T: str) -> str:
+    # max_distance is precomputed by the emitter when Randomness/Exponent are constant; < 0 means compute here
+    return f"((max_distance >= 0.0f) ? max_distance : voronoi_distance({T}(0.0f), {T}(0.5f + 0.5f * params.randomness), params))"
+
+
+def _render(CoordT: str, T: str, SUFFIX: str, SCALED_COORD: str) -> dict:
+    subs = dict(_INIT_PARAMS, CoordT=CoordT, T=T, SUFFIX=SUFFIX, SCALED_COORD=SCALED_COORD,
+                MAX_DISTANCE=_max_distance(T))
+    funcs = {feature: tpl.substitute(subs) for feature, tpl in _NODE_TEX_VORONOI.items()}
+    funcs.update({f"{feature}_nofractal": tpl.substitute(subs) for feature, tpl in _NODE_TEX_VORONOI_NOFRACTAL.items()})
+    return funcs
+
+
+# Per-dimension entry points by name, e.g. 'f1' or 'f1_nofractal' (4D takes vec3 + w and builds a float4)
+VORONOI_TEX_FUNCS = {
+    '1D': _render('float', 'float', '1d', 'coord * scale'),
+    '2D': _render('float2', 'float2', '2d', 'coord * scale'),
+    '3D': _render('float3', 'float3', '3d', 'coord * scale'),
+    '4D': _render('float3', 'float4', '4d', 'float4(coord, w) * scale'),
+}
+
+VORONOI_TEX_INSTANCES_GLSL = {
+    dims: ''.join(funcs.values()) for dims, funcs in VORONOI_TEX_FUNCS.items()
+}
+
+VORONOI_TEX_GLSL = ''.join(VORONOI_TEX_INSTANCES_GLSL.values())
@@ -18,6 +18,8 @@ Exception Hierarchy:
         └── ResourceNotFoundError
 """
 
+import io
+
 
 class ComputeNodesError(Exception):
     """Base exception for all Compute Nodes errors."""
@@ -42,7 +44,9 @@ class ShaderCompileError(CompilationError):
         error_message: The error from the GPU driver
     """
     
-    def __init__(self, message: str, source: str = None, error_message: str = None):
+    __slots__ = ("source", "error_message")
+    
+    def __init__(self, message: str, *, source: str = None, error_message: str = None):
         super().__init__(message)
         self.source = source
         self.error_message = error_message
@@ -52,21 +56,23 @@ class ShaderCompileError(CompilationError):
         if not self.source:
             return str(self)
         
-        lines = []
-        lines.append(f"ShaderCompileError: {self}")
+        buf = io.StringIO()
+        buf.write(f"ShaderCompileError: {self}\n")
         if self.error_message:
-            lines.append(f"GPU Error: {self.error_message}")
-        lines.append("--- SHADER SOURCE ---")
-        for i, line in enumerate(self.source.split('\n')):
-            lines.append(f"{i+1:03d}: {line}")
-        lines.append("---------------------")
-        return '\n'.join(lines)
+            buf.write(f"GPU Error: {self.error_message}\n")
+        buf.write("--- SHADER SOURCE ---\n")
+        for i, line in enumerate(self.source.splitlines(), 1):
+            buf.write(f"{i:03d}: {line}\n")
+        buf.write("---------------------")
+        return buf.getvalue()
 
 
 class GraphExtractionError(CompilationError):
     """Raised when node graph extraction fails."""
     
-    def __init__(self, message: str, node_name: str = None):
+    __slots__ = ("node_name",)
+    
+    def __init__(self, message: str, *, node_name: str = None):
         super().__init__(message)
         self.node_name = node_name
 
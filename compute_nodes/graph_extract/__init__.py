@@ -1,6 +1,6 @@
 # Graph Extraction Package
 # Converts Blender node trees into IR graphs
 
-from .core import extract_graph
+from .core import extract_graph, invalidate_output_nodes
 
-__all__ = ['extract_graph']
+__all__ = ['extract_graph', 'invalidate_output_nodes']
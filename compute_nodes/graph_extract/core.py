@@ -2,13 +2,15 @@
 # Converts a ComputeNodeTree into an IR Graph using modular handlers
 
 import logging
-from typing import Dict, Set
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Final, List, Optional, Set, Tuple
 
 from ..ir.graph import Graph, IRBuilder, Value, ValueKind
 from ..ir.resources import ImageDesc, ResourceAccess
 from ..ir.types import DataType
 
-from .registry import get_handler
+from .registry import HANDLER_REGISTRY, HandlerType, LEAF_FAST_PATH
+from .node_context import _SOCKET_TYPE_TO_DT, NodeContext, default_constant, reset_scope_ids, scope_id, socket_key
 
 logger = logging.getLogger(__name__)
 
@@ -19,214 +21,453 @@ except ImportError:
     bpy = None
 
 
-def extract_graph(nodetree) -> Graph:
+@dataclass(slots=True)
+class _SocketSnap:
+    """RNA attributes of a socket, read once per extraction."""
+    ptr: int
+    bl_idname: str
+    type: str
+    node_bl_idname: str
+    has_default: bool
+    link_count: int
+    from_socket: Any = None
+    from_node: Any = None
+    from_ptr: int = 0
+
+
+def _pointer(obj) -> int:
+    # One attribute lookup on the RNA path instead of hasattr + getattr
+    as_pointer = getattr(obj, "as_pointer", None)
+    if as_pointer is not None:
+        return as_pointer()
+    return id(obj)
+
+
+def _links_by_socket(nodetree) -> Dict[int, List[Any]]:
     """
-    Converts a ComputeNodeTree into an IR Graph.
-    Uses modular handlers for each node type.
+    Incoming links of a tree keyed by to_socket pointer, built in one pass.
+    
+    NodeSocket.links scans the whole tree link list on every access, so
+    reading it per socket is O(E) each. Trees without a links collection
+    yield an empty map and fall back to NodeSocket.links.
     """
-    graph = Graph(name=nodetree.name)
+    links_by_socket: Dict[int, List[Any]] = {}
+    for link in getattr(nodetree, 'links', ()):
+        links_by_socket.setdefault(_pointer(link.to_socket), []).append(link)
+    return links_by_socket
+
+
+def _snapshot_socket(socket, ptr: int, links_by_socket: Dict[int, List[Any]]) -> _SocketSnap:
+    links = ()
+    if socket.is_linked:
+        # Sockets of group trees aren't in the top-level map
+        links = links_by_socket.get(ptr) or socket.links
+    snap = _SocketSnap(
+        ptr=ptr,
+        bl_idname=getattr(socket, 'bl_idname', ''),
+        type=getattr(socket, 'type', None),
+        node_bl_idname=socket.node.bl_idname if getattr(socket, 'node', None) else '',
+        has_default=hasattr(socket, "default_value"),
+        link_count=len(links),
+    )
+    if links:
+        link = links[0]
+        snap.from_socket = link.from_socket
+        snap.from_node = link.from_node
+        snap.from_ptr = _pointer(link.from_socket)
+    return snap
+
+
+OUTPUT_BL_IDNAMES: Final = frozenset({'ComputeNodeOutputImage', 'ComputeNodeOutputSequence', 'ComputeNodeViewer'})
+
+# Tree pointer -> (node count, output node names). Dropped by ComputeNodeTree.update()
+# on topology changes, and re-validated on lookup for anything update() misses.
+_OUTPUT_NODE_CACHE: Dict[int, Tuple[int, List[str]]] = {}
+
+
+def invalidate_output_nodes(nodetree) -> None:
+    """Forget the cached output nodes of a tree."""
+    _OUTPUT_NODE_CACHE.pop(_pointer(nodetree), None)
+
+
+def _find_output_nodes(nodetree) -> List[Any]:
+    """Output Image / Output Sequence / Viewer nodes of a tree, without rescanning on repeat runs."""
+    tree_key = _pointer(nodetree)
+    nodes = nodetree.nodes
+    cached = _OUTPUT_NODE_CACHE.get(tree_key)
+    if cached is not None and cached[0] == len(nodes):
+        output_nodes = [nodes.get(name) for name in cached[1]]
+        if all(node is not None and node.bl_idname in OUTPUT_BL_IDNAMES for node in output_nodes):
+            return output_nodes
     
-    from ..logger import log_debug
-    log_debug(f"Graph extraction started for '{nodetree.name}' ({len(nodetree.nodes)} nodes)")
+    output_nodes = [node for node in nodes if node.bl_idname in OUTPUT_BL_IDNAMES]
+    _OUTPUT_NODE_CACHE[tree_key] = (len(nodes), [node.name for node in output_nodes])
+    return output_nodes
+
+
+# Nodes that manage scope, loop state or outputs (and reroutes, which don't map
+# their output socket) are always evaluated through GraphExtractor.process_node.
+BARRIER_BL_IDNAMES: Final = OUTPUT_BL_IDNAMES | frozenset({
+    'ComputeNodeRepeatInput', 'ComputeNodeRepeatOutput',
+    'ComputeNodeGroup', 'ComputeNodeGroupInput', 'ComputeNodeGroupOutput',
+    'NodeReroute',
+})
+
+# Phases of a GraphExtractor.prefetch_upstream stack entry
+ENTER: Final = 0
+EXIT: Final = 1
+
+
+class GraphExtractor:
+    """
+    State of one ComputeNodeTree -> IR Graph extraction.
     
-    builder = IRBuilder(graph)
+    Plain upstream subgraphs are evaluated by prefetch_upstream with an
+    explicit (node, phase) stack; process_node/get_socket_value recursion is
+    only used for barrier nodes (groups, repeat zones, outputs, reroutes).
+    """
     
-    # Map: Socket Pointer (int) -> Value (SSA)
-    socket_value_map: Dict[int, Value] = {}
+    def __init__(self, nodetree):
+        self.nodetree = nodetree
+        self.graph = Graph(name=nodetree.name)
+        self.builder = IRBuilder(self.graph)
+        
+        # Map: Socket key (int) -> Value (SSA)
+        self.socket_value_map: Dict[int, Value] = {}
+        
+        # Dense node index (assigned by get_node_info) -> 1 while the node is
+        # being evaluated, for cycle detection
+        self.visiting: bytearray = bytearray()
+        
+        # Shared extraction state (propagated through all NodeContext instances)
+        # loop_depth: 0 = outside any loop, 1+ = inside loop(s)
+        self.extraction_state: Dict[str, Any] = {
+            'loop_depth': 0,
+        }
+        
+        # Map: Socket Pointer (int) -> _SocketSnap, filled on first visit so that
+        # link/type lookups don't cross into RNA again (covers group trees too)
+        self.socket_info: Dict[int, _SocketSnap] = {}
+        self.links_by_socket = _links_by_socket(nodetree)
+        
+        # Map: Node Pointer (int) -> (bl_idname, handler, dense index), so repeat
+        # visits of a node skip both the RNA bl_idname read and the registry lookup
+        self.node_info: Dict[int, Tuple[str, Optional[HandlerType], int]] = {}
+        
+        # Scope-bound socket accessors, built once per scope instead of per node
+        self.scope_accessors: Dict[int, Tuple[Callable, Callable]] = {}
+        
+        # NodeContexts reused per process_node nesting depth: a handler's context is
+        # left untouched while it recurses, and nodes at the same depth share one object
+        self.ctx_pool: List[NodeContext] = []
+        self.ctx_depth: int = 0
+        
+        # Output socket keys filled by prefetch_upstream; auto-sample still applies to them
+        self.prefetched_keys: Set[int] = set()
     
-    # Recursion stack for cycle detection
-    recursion_stack: Set[int] = set()
+    def extract(self) -> Graph:
+        """Run every output node's handler and return the populated Graph."""
+        graph = self.graph
+        output_nodes = _find_output_nodes(self.nodetree)
+        
+        if not output_nodes:
+            logger.warning("No Output Node found (Output Image or Output Sequence)")
+            return graph
+        
+        # One typed context shared by the output handlers; only the node and
+        # the per-handler extras change between them
+        ctx = NodeContext(
+            builder=self.builder,
+            node=None,
+            socket_value_map=self.socket_value_map,
+            get_socket_key=self.get_socket_key,
+            get_socket_value=self.get_socket_value,
+        )
+        extra = ctx.extra
+        
+        try:
+            # Process all output nodes via their registered handlers
+            for output_node in output_nodes:
+                ctx.node = output_node
+                ctx._out_keys = None
+                extra.clear()
+                extra['output_socket_needed'] = None
+                
+                # Use the registered handler for output nodes
+                bl_idname, handler, _ = self.get_node_info(output_node, _pointer(output_node))
+                if handler:
+                    handler(output_node, ctx)
+                else:
+                    logger.error(f"No handler registered for {bl_idname}")
+        finally:
+            self.release()
+        
+        return graph
     
-    # Shared extraction state (propagated through all NodeContext instances)
-    # loop_depth: 0 = outside any loop, 1+ = inside loop(s)
-    extraction_state: Dict[str, any] = {
-        'loop_depth': 0,
-    }
+    def release(self) -> None:
+        """
+        Drop the per-extraction maps once the Graph is built.
+        
+        The scope accessor closures and pooled contexts point back at the
+        extractor, so without this the maps (and the RNA wrappers held by
+        socket snapshots) would live until the cyclic GC next runs.
+        """
+        self.socket_value_map.clear()
+        self.socket_info.clear()
+        self.links_by_socket.clear()
+        self.node_info.clear()
+        self.scope_accessors.clear()
+        self.ctx_pool.clear()
+        self.prefetched_keys.clear()
+        self.extraction_state.pop('repeat_pairing', None)
+        reset_scope_ids()
     
-    # Find Output Nodes (Output Image, Output Sequence, Viewer)
-    output_nodes = []
-    output_bl_idnames = {'ComputeNodeOutputImage', 'ComputeNodeOutputSequence', 'ComputeNodeViewer'}
-    for node in nodetree.nodes:
-        if node.bl_idname in output_bl_idnames:
-            output_nodes.append(node)
-            
-    if not output_nodes:
-        logger.warning("No Output Node found (Output Image or Output Sequence)")
-        return graph
-
-    def get_socket_key(socket, scope=()):
+    def get_socket_snap(self, socket, ptr: Optional[int] = None) -> _SocketSnap:
+        if ptr is None:
+            ptr = _pointer(socket)
+        snap = self.socket_info.get(ptr)
+        if snap is None:
+            snap = self.socket_info[ptr] = _snapshot_socket(socket, ptr, self.links_by_socket)
+        return snap
+    
+    def get_socket_key(self, socket, scope: tuple = ()) -> int:
         """Get unique key for a socket, including scope for NodeGroup differentiation."""
-        if hasattr(socket, "as_pointer"):
-            ptr = socket.as_pointer()
-        else:
-            ptr = id(socket)
-        # Include scope tuple for unique keys across NodeGroup instances
-        return (ptr, tuple(scope))
-
-    def get_node_key(node):
-        """Get unique key for a node."""
-        if hasattr(node, "as_pointer"):
-            return node.as_pointer()
-        return id(node)
-
-    def get_socket_value(socket, scope=()) -> Value:
-        """Recursively get or compute the value for a socket.
+        # Include interned scope id for unique keys across NodeGroup instances
+        return socket_key(_pointer(socket), scope_id(scope))
+    
+    def get_node_info(self, node, key_node: int) -> Tuple[str, Optional[HandlerType], int]:
+        info = self.node_info.get(key_node)
+        if info is None:
+            bl_idname = node.bl_idname
+            visiting = self.visiting
+            info = self.node_info[key_node] = (bl_idname, HANDLER_REGISTRY.get(bl_idname), len(visiting))
+            visiting.append(0)
+        return info
+    
+    def get_scope_accessors(self, scope) -> Tuple[Callable[[Any], int], Callable[[Any], Optional[Value]]]:
+        sid = scope_id(scope)
+        accessors = self.scope_accessors.get(sid)
+        if accessors is None:
+            scope = tuple(scope)
+            get_socket_value = self.get_socket_value
+            
+            def scoped_get_socket_key(socket) -> int:
+                return socket_key(_pointer(socket), sid)
+            
+            def scoped_get_socket_value(socket) -> Optional[Value]:
+                return get_socket_value(socket, scope)
+            
+            accessors = self.scope_accessors[sid] = (scoped_get_socket_key, scoped_get_socket_value)
+        return accessors
+    
+    def get_socket_value(self, socket, scope: tuple = ()) -> Optional[Value]:
+        """Get or compute the value for a socket.
         
         Auto-Sample Feature:
         When a Grid (HANDLE) is connected to a socket expecting a Field value
         (FLOAT, VEC3, VEC4, RGBA), automatically inject a sample operation
         using normalized UV coordinates.
         """
-        key = get_socket_key(socket, scope)
-        if hasattr(socket, 'name'):
-             pass # print(f"DEBUG_CORE: get_socket_value {socket.name} (Node: {socket.node.name if hasattr(socket, 'node') and socket.node else 'None'}). Linked: {socket.is_linked}")
-
+        socket_value_map = self.socket_value_map
+        scope = tuple(scope)
+        sid = scope_id(scope)
+        ptr = _pointer(socket)
+        key = socket_key(ptr, sid)
         if key in socket_value_map:
             return socket_value_map[key]
-            
-        # print(f"DEBUG: get_socket_value {socket.name} (Node: {socket.node.name}). Linked: {socket.is_linked}")
+        
+        snap = self.get_socket_snap(socket, ptr)
             
         # If linked, traverse
-        if socket.is_linked:
-            if len(socket.links) > 1:
+        if snap.link_count:
+            if snap.link_count > 1:
                 raise ValueError(f"Socket {socket.name} has multiple links, which is not supported for Inputs.")
             
-            link = socket.links[0]
-            from_socket = link.from_socket
-            from_node = link.from_node
+            from_socket = snap.from_socket
+            from_node = snap.from_node
             
             # Optimization/Cycle Breaking: Check if source socket is already computed
-            # This allows reading outputs from a node that is currently on the recursion stack
+            # This allows reading outputs from a node that is currently being visited
             # (e.g. Repeat Input providing values for the loop body)
-            from_key = get_socket_key(from_socket, scope)
-            if from_key in socket_value_map:
+            from_key = socket_key(snap.from_ptr, sid)
+            if from_key in socket_value_map and from_key not in self.prefetched_keys:
                 val = socket_value_map[from_key]
                 socket_value_map[key] = val
                 return val
             
-            # Recursive call to process dependency (pass scope)
-            val = process_node(from_node, from_socket, scope)
+            if from_key not in socket_value_map:
+                # Evaluate the plain upstream subgraph iteratively first
+                self.prefetch_upstream(from_node, scope)
+            
+            if from_key in socket_value_map:
+                val = socket_value_map[from_key]
+            else:
+                # Barrier node (or handler that doesn't map this output): recurse (pass scope)
+                val = self.process_node(from_node, from_socket, scope)
             
             # === AUTO-SAMPLE: Grid → Field conversion ===
             # If we got a HANDLE (Grid) but the socket expects a field type,
             # automatically inject sampling with normalized UVs.
-            if val is not None and val.type == DataType.HANDLE:
-                socket_type = getattr(socket, 'type', None)
+            if val is not None and val.type is DataType.HANDLE:
                 # Field-expecting sockets: VALUE, VECTOR, RGBA
                 # EXCEPTION: NodeReroute sockets appear as RGBA but should pass-through Handles/Grids without sampling.
-                if socket_type in ('VALUE', 'VECTOR', 'RGBA', 'FLOAT') and socket.node.bl_idname != 'NodeReroute':
+                if snap.type in ('VALUE', 'VECTOR', 'RGBA', 'FLOAT') and snap.node_bl_idname != 'NodeReroute':
                     # Create normalized UV from gl_GlobalInvocationID
                     # Uses placeholder that emit_sample will expand inline
-                    uv_placeholder = builder.constant((0.5, 0.5), DataType.VEC2)
-                    val = builder.sample(val, uv_placeholder)
+                    uv_placeholder = self.builder.constant((0.5, 0.5), DataType.VEC2)
+                    val = self.builder.sample(val, uv_placeholder)
                     logger.debug(f"Auto-sample injected for {socket.name}")
             
             socket_value_map[key] = val
             return val
         else:
             # Not linked: Use default value
-            if hasattr(socket, "default_value"):
+            if snap.has_default:
                 # Handle NodeSocketImage default value (native Blender Image pointer)
-                if socket.bl_idname == 'NodeSocketImage':
+                if snap.bl_idname == 'NodeSocketImage':
                     img = socket.default_value
                     if not img:
                         return None
                     
                     fmt = "rgba32f" if img.is_float else "rgba8"
                     desc = ImageDesc(name=img.name, access=ResourceAccess.READ, format=fmt)
-                    val = builder.add_resource(desc)
+                    val = self.builder.add_resource(desc)
                     socket_value_map[key] = val
                     return val
 
                 # Determine type based on socket type
-                dtype = DataType.FLOAT 
-                if socket.type == 'VECTOR': dtype = DataType.VEC3
-                elif socket.type == 'RGBA': dtype = DataType.VEC4
-                elif socket.type == 'INT': dtype = DataType.INT
-                elif socket.type == 'BOOLEAN': dtype = DataType.BOOL
+                dtype = _SOCKET_TYPE_TO_DT.get(snap.type, DataType.FLOAT)
                 
-                const_val = builder.constant(socket.default_value, dtype)
+                const_val = default_constant(self.builder, socket.default_value, dtype)
                 socket_value_map[key] = const_val
                 return const_val
             
             # Unlinked non-value socket
             return None 
-
-    from .node_context import NodeContext
     
-    def process_node(node, out_socket=None, scope=()) -> Value:
+    def process_node(self, node, out_socket=None, scope: tuple = ()) -> Optional[Value]:
         """
         Process a single node and return the value for the requested output socket.
         """
-        key_node = get_node_key(node)
+        key_node = _pointer(node)
+        bl_idname, handler, index = self.get_node_info(node, key_node)
+        visiting = self.visiting
         
         # Cycle detection
-        if key_node in recursion_stack:
+        if visiting[index]:
             # Check for Loop Input nodes - they break cycles by valid design
-            if node.bl_idname == 'ComputeNodeRepeatInput':
+            if bl_idname == 'ComputeNodeRepeatInput':
                 # Return whatever is available (likely None if not processed, but handled by pass splitting)
                 pass
             else:
                 raise RecursionError(f"Cycle detected at node {node.name}")
 
-        recursion_stack.add(key_node)
+        if not handler:
+            logger.warning(f"No handler for {bl_idname}")
+            return None
         
-        try:
-            handler = get_handler(node.bl_idname)
-            if not handler:
-                logger.warning(f"No handler for {node.bl_idname}")
-                return None
-            
-            # Create typed context - include extraction_state reference for loop_depth tracking
-            # Pass as 'extraction_state' key so the dict can be modified by handlers
-            # Create scope-aware wrappers for this context
-            def scoped_get_socket_key(socket):
-                return get_socket_key(socket, scope)
-            
-            def scoped_get_socket_value(socket):
-                return get_socket_value(socket, scope)
-            
+        # Leaf fast path: no inputs to resolve, so no NodeContext needed
+        leaf = LEAF_FAST_PATH.get(bl_idname)
+        if leaf is not None:
+            socket_value_map = self.socket_value_map
+            sid = scope_id(scope)
+            values = leaf(node, self.builder, out_socket)
+            for socket, val in zip(node.outputs, values):
+                if val is not None:
+                    socket_value_map[socket_key(_pointer(socket), sid)] = val
+            if out_socket is not None:
+                return socket_value_map.get(socket_key(_pointer(out_socket), sid))
+            return values[0] if values else None
+        
+        # Typed context - include extraction_state reference for loop_depth tracking
+        # Pass as 'extraction_state' key so the dict can be modified by handlers
+        scoped_get_socket_key, scoped_get_socket_value = self.get_scope_accessors(scope)
+        
+        ctx_pool = self.ctx_pool
+        depth = self.ctx_depth
+        if depth < len(ctx_pool):
+            ctx = ctx_pool[depth]
+            ctx.node = node
+            ctx._out_keys = None
+            ctx._get_socket_key = scoped_get_socket_key
+            ctx._get_socket_value = scoped_get_socket_value
+            ctx.extra.clear()
+            ctx.extra['extraction_state'] = self.extraction_state
+        else:
             ctx = NodeContext(
-                builder=builder,
+                builder=self.builder,
                 node=node,
-                socket_value_map=socket_value_map,
+                socket_value_map=self.socket_value_map,
                 get_socket_key=scoped_get_socket_key,
                 get_socket_value=scoped_get_socket_value,
-                extra_ctx={
-                    'output_socket_needed': out_socket,
-                    'extraction_state': extraction_state,
-                    'scope_path': list(scope),  # Current scope as mutable list
-                }
+                extra_ctx={'extraction_state': self.extraction_state}
             )
-            
+            ctx_pool.append(ctx)
+        ctx.extra['output_socket_needed'] = out_socket
+        ctx.extra['scope_path'] = list(scope)  # Current scope as mutable list
+        
+        visiting[index] = 1
+        self.ctx_depth = depth + 1
+        try:
             # Execute handler
             # Handlers execute side-effects (emit ops) and populate socket_value_map
-            result = handler(node, ctx)
-            
-            return result
+            return handler(node, ctx)
             
         finally:
-            recursion_stack.remove(key_node)
-
-    # Process all output nodes via their registered handlers
-    # Process all output nodes via their registered handlers
-    for output_node in output_nodes:
-        # Create typed context for output handler
-        ctx = NodeContext(
-            builder=builder,
-            node=output_node,
-            socket_value_map=socket_value_map,
-            get_socket_key=get_socket_key,
-            get_socket_value=get_socket_value,
-            extra_ctx={'output_socket_needed': None}
-        )
-        
-        # Use the registered handler for output nodes
-        handler = get_handler(output_node.bl_idname)
-        if handler:
-            handler(output_node, ctx)
-        else:
-            logger.error(f"No handler registered for {output_node.bl_idname}")
+            self.ctx_depth = depth
+            visiting[index] = 0
     
-    return graph
+    def prefetch_upstream(self, node, scope: tuple = ()) -> None:
+        """
+        Evaluate node and the plain nodes feeding it in post-order, using an
+        explicit (node, phase) stack instead of one process_node/get_socket_value
+        frame pair per edge. Handlers then find their linked inputs in
+        socket_value_map.
+        
+        On ENTER a node pushes its own EXIT entry, then the source nodes of its
+        unresolved links; on EXIT its handler runs. Barrier nodes, nodes without
+        a handler and nodes already being visited are skipped and left to the
+        recursive path, which also keeps cycle detection there. So are leaf
+        fast-path nodes, which get_socket_value evaluates per requested socket.
+        """
+        socket_value_map = self.socket_value_map
+        visiting = self.visiting
+        get_node_info = self.get_node_info
+        get_socket_snap = self.get_socket_snap
+        process_node = self.process_node
+        prefetched_keys = self.prefetched_keys
+        sid = scope_id(scope)
+        seen: Set[int] = set()
+        stack = [(node, ENTER)]
+        while stack:
+            cur, phase = stack.pop()
+            if phase == EXIT:
+                process_node(cur, None, scope)
+                for socket in cur.outputs:
+                    out_key = socket_key(_pointer(socket), sid)
+                    if out_key in socket_value_map:
+                        prefetched_keys.add(out_key)
+                continue
+            key_node = _pointer(cur)
+            if key_node in seen:
+                continue
+            bl_idname, handler, index = get_node_info(cur, key_node)
+            if visiting[index] or bl_idname in BARRIER_BL_IDNAMES or bl_idname in LEAF_FAST_PATH or handler is None:
+                continue
+            seen.add(key_node)
+            stack.append((cur, EXIT))
+            for socket in cur.inputs:
+                snap = get_socket_snap(socket)
+                if snap.link_count and socket_key(snap.from_ptr, sid) not in socket_value_map:
+                    stack.append((snap.from_node, ENTER))
 
+
+def extract_graph(nodetree) -> Graph:
+    """
+    Converts a ComputeNodeTree into an IR Graph.
+    Uses modular handlers for each node type.
+    """
+    from ..logger import log_debug
+    log_debug(f"Graph extraction started for '{nodetree.name}' ({len(nodetree.nodes)} nodes)")
+    
+    return GraphExtractor(nodetree).extract()
@@ -6,7 +6,59 @@
 # of the grid they're operating on, not the downstream dispatch context.
 
 from contextlib import contextmanager
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+from ...ir.resources import ImageDesc
+
+
+# Token returned by _push_grid_context when there was no grid to push
+_NOT_PUSHED = object()
+
+
+def _resolve_grid(ctx: Any, grid_value: Any) -> Optional[Tuple[int, Optional[tuple]]]:
+    """(dimensions, size) of the resource behind a grid value, or None if it has none."""
+    if grid_value is None:
+        return None
+    
+    resource_index = getattr(grid_value, 'resource_index', None)
+    if resource_index is None:
+        return None
+    
+    graph = ctx.graph
+    if graph is None or resource_index >= len(graph.resources):
+        return None
+    
+    resource = graph.resources[resource_index]
+    if isinstance(resource, ImageDesc):
+        return (resource.dimensions, resource.size)
+    # Samplers and buffers carry no shape; treat them as unsized 2D
+    return (2, None)
+
+
+def _push_grid_context(ctx: Any, grid_value: Any) -> Any:
+    """
+    Set sample_grid_context in ctx.extra for grid_value's resource.
+    
+    Returns:
+        Token to hand back to _pop_grid_context
+    """
+    grid = _resolve_grid(ctx, grid_value)
+    if grid is None:
+        return _NOT_PUSHED
+    
+    storage = ctx.extra
+    old_context = storage.get('sample_grid_context')
+    storage['sample_grid_context'] = {
+        'dimensions': grid[0],  # 1, 2, or 3
+        'size': grid[1],        # (w,) or (w,h) or (w,h,d)
+    }
+    return old_context
+
+
+def _pop_grid_context(ctx: Any, token: Any) -> None:
+    """Restore the sample_grid_context that _push_grid_context replaced."""
+    if token is not _NOT_PUSHED:
+        ctx.extra['sample_grid_context'] = token
 
 
 @contextmanager
@@ -21,52 +73,21 @@ def grid_field_context(ctx: Any, grid_value: Any):
             val_field = get_socket_value(node.inputs[1])  # Field input
         # Position nodes in val_field's upstream will use grid's dimensions
     
+    Hot handlers can call _push_grid_context / _pop_grid_context directly in
+    a try/finally and skip the generator frame.
+    
     Args:
-        ctx: The handler context dict
+        ctx: The handler NodeContext
         grid_value: The Value representing the grid resource
     
     Yields:
-        The context dict with sample_grid_context set (or unchanged if no grid)
+        The context with sample_grid_context set in ctx.extra (or unchanged if no grid)
     """
-    if grid_value is None:
-        yield ctx
-        return
-    
-    resource_index = getattr(grid_value, 'resource_index', None)
-    if resource_index is None:
-        yield ctx
-        return
-    
-    # Handle NodeContext object vs dict
-    if hasattr(ctx, 'graph'):
-        graph = ctx.graph
-        storage = ctx.extra
-    else:
-        graph = ctx.get('graph')
-        storage = ctx
-    
-    if graph is None or resource_index >= len(graph.resources):
-        yield ctx
-        return
-    
-    resource = graph.resources[resource_index]
-    dimensions = getattr(resource, 'dimensions', 2)
-    size = getattr(resource, 'size', None)
-    
-    # Save old context
-    old_context = storage.get('sample_grid_context')
-    
-    # Push new context
-    storage['sample_grid_context'] = {
-        'dimensions': dimensions,  # 1, 2, or 3
-        'size': size,              # (w,) or (w,h) or (w,h,d)
-    }
-    
+    token = _push_grid_context(ctx, grid_value)
     try:
         yield ctx
     finally:
-        # Restore old context
-        storage['sample_grid_context'] = old_context
+        _pop_grid_context(ctx, token)
 
 
 def get_grid_dimensions(ctx: Any, grid_value: Any) -> tuple:
@@ -76,24 +97,7 @@ def get_grid_dimensions(ctx: Any, grid_value: Any) -> tuple:
     Returns:
         Tuple of (dimensions: int, size: tuple or None)
     """
-    if grid_value is None:
-        return (2, None)
-    
-    resource_index = getattr(grid_value, 'resource_index', None)
-    if resource_index is None:
+    grid = _resolve_grid(ctx, grid_value)
+    if grid is None:
         return (2, None)
-    
-    # Handle NodeContext object vs dict
-    if hasattr(ctx, 'graph'):
-        graph = ctx.graph
-    else:
-        graph = ctx.get('graph')
-    
-    if graph is None or resource_index >= len(graph.resources):
-        return (2, None)
-    
-    resource = graph.resources[resource_index]
-    dimensions = getattr(resource, 'dimensions', 2)
-    size = getattr(resource, 'size', None)
-    
-    return (dimensions, size)
+    return grid
@@ -2,14 +2,31 @@
 # Handles: ComputeNodePosition, ComputeNodeSwitch, ComputeNodeMix
 
 from typing import Optional, Any
-from ...ir.graph import ValueKind
 from ...ir.ops import OpCode
 from ...ir.types import DataType
 
+# Switch/Mix data_type enum -> DataType of the result (FLOAT otherwise)
+_DATA_TYPE_TO_DT = {
+    'VEC3': DataType.VEC3,
+    'RGBA': DataType.VEC4,
+}
 
-def handle_position(node, ctx):
+# Mix blend_type -> OpCode combining A and B (MIX and unknown modes use B as is)
+_BLEND_OPCODES = {
+    'ADD': OpCode.ADD,
+    'MULTIPLY': OpCode.MUL,
+    'SUBTRACT': OpCode.SUB,
+    'DIVIDE': OpCode.DIV,
+}
+
+
+def position_outputs(node, builder, output_socket_needed=None) -> list:
     """
-    Handle ComputeNodePosition node.
+    Values of ComputeNodePosition's outputs, in socket order.
+    
+    The node has no inputs, so this only needs the builder (leaf fast path).
+    When output_socket_needed is given, outputs it doesn't depend on are not
+    built and come back as None.
     
     Outputs:
     - Coordinate: raw ivec3 from gl_GlobalInvocationID
@@ -19,86 +36,76 @@ def handle_position(node, ctx):
     For 2D dispatches (depth=1), Z will be 0/1 = 0.
     For 3D dispatches, Z will be properly normalized.
     """
-    builder = ctx.builder
-    output_socket_needed = ctx.extra.get('output_socket_needed')
+    outputs = node.outputs
+    needed = None
+    if output_socket_needed is not None:
+        needed = outputs[:].index(output_socket_needed)
     
-    # Builtin: gl_GlobalInvocationID -> uvec3
+    # Builtin: gl_GlobalInvocationID -> uvec3 (shared by all three outputs)
     val_gid = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
-    val_pos = builder.cast(val_gid, DataType.VEC3)
     
-    ctx.set_output(0, val_pos)  # "Coordinate"
+    # Coordinate is also the input of Normalized
+    val_pos = None
+    if needed is None or needed < 2:
+        val_pos = builder.cast(val_gid, DataType.VEC3)
+    
+    values = [val_pos]  # "Coordinate"
 
     # Normalized Output using u_dispatch uniforms (all 3 dimensions)
-    if len(node.outputs) > 1:
-        # Use u_dispatch_width/height/depth uniforms
-        # These are set per-pass to the actual dispatch size
-        val_width = builder.builtin("u_dispatch_width", DataType.INT)
-        val_height = builder.builtin("u_dispatch_height", DataType.INT)
-        val_depth = builder.builtin("u_dispatch_depth", DataType.INT)
-        
-        # Convert to float for division
-        val_width_f = builder.cast(val_width, DataType.FLOAT)
-        val_height_f = builder.cast(val_height, DataType.FLOAT)
-        val_depth_f = builder.cast(val_depth, DataType.FLOAT)
-        
-        # Build vec3(width, height, depth) for division
-        op_size = builder.add_op(OpCode.COMBINE_XYZ, [val_width_f, val_height_f, val_depth_f])
-        val_size_vec3 = builder._new_value(ValueKind.SSA, DataType.VEC3, origin=op_size)
-        op_size.add_output(val_size_vec3)
+    if len(outputs) > 1 and needed in (None, 1):
+        # u_dispatch_size is ivec3(u_dispatch_width, u_dispatch_height, u_dispatch_depth),
+        # defined in every shader header from the per-pass dispatch uniforms.
+        # One vector cast instead of three scalar casts and a COMBINE_XYZ.
+        val_size = builder.builtin("u_dispatch_size", DataType.IVEC3)
+        val_size_vec3 = builder.cast(val_size, DataType.VEC3)
         
         # CRITICAL FIX: Add 0.5 texel offset for texel-center sampling
         # Without this, UV = pos/size points to texel corners (0/512, 1/512...)
         # texture() with bilinear filtering expects texel centers ((pos+0.5)/size)
         # In loops with Sample+Capture, this 0.5 texel error accumulates per iteration
-        val_half = builder.constant(0.5, DataType.FLOAT)
-        val_half_vec3 = builder.add_op(OpCode.COMBINE_XYZ, [val_half, val_half, val_half])
-        val_offset = builder._new_value(ValueKind.SSA, DataType.VEC3, origin=val_half_vec3)
-        val_half_vec3.add_output(val_offset)
+        val_offset = builder.constant((0.5, 0.5, 0.5), DataType.VEC3)
         
         # pos + 0.5
-        op_offset_pos = builder.add_op(OpCode.ADD, [val_pos, val_offset])
-        val_centered_pos = builder._new_value(ValueKind.SSA, DataType.VEC3, origin=op_offset_pos)
-        op_offset_pos.add_output(val_centered_pos)
+        val_centered_pos = builder.emit(OpCode.ADD, [val_pos, val_offset], DataType.VEC3)
         
         # Normalize: (pos + 0.5) / size -> texel center UVs
-        op_div = builder.add_op(OpCode.DIV, [val_centered_pos, val_size_vec3])
-        val_norm = builder._new_value(ValueKind.SSA, DataType.VEC3, origin=op_div)
-        op_div.add_output(val_norm)
+        val_norm = builder.emit(OpCode.DIV, [val_centered_pos, val_size_vec3], DataType.VEC3)
         
-        ctx.set_output(1, val_norm)
+        values.append(val_norm)
+    elif len(outputs) > 1:
+        values.append(None)
 
 
     # Global Index Output
-    if len(node.outputs) > 2:
-        val_gid_uvec = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
+    if len(outputs) > 2 and needed in (None, 2):
         val_num_wg = builder.builtin("gl_NumWorkGroups", DataType.UVEC3)
         val_wg_size = builder.builtin("gl_WorkGroupSize", DataType.UVEC3)
         
-        op_size = builder.add_op(OpCode.MUL, [val_num_wg, val_wg_size])
-        val_size = builder._new_value(ValueKind.SSA, DataType.UVEC3, origin=op_size)
-        op_size.add_output(val_size)
+        val_size = builder.emit(OpCode.MUL, [val_num_wg, val_wg_size], DataType.UVEC3)
         
-        val_x = builder.swizzle(val_gid_uvec, "x")
-        val_y = builder.swizzle(val_gid_uvec, "y")
+        val_x = builder.swizzle(val_gid, "x")
+        val_y = builder.swizzle(val_gid, "y")
         val_width = builder.swizzle(val_size, "x")
         
-        op_mul_idx = builder.add_op(OpCode.MUL, [val_y, val_width])
-        val_y_w = builder._new_value(ValueKind.SSA, DataType.UINT, origin=op_mul_idx)
-        op_mul_idx.add_output(val_y_w)
+        val_y_w = builder.emit(OpCode.MUL, [val_y, val_width], DataType.UINT)
         
-        op_add_idx = builder.add_op(OpCode.ADD, [val_y_w, val_x])
-        val_idx_uint = builder._new_value(ValueKind.SSA, DataType.UINT, origin=op_add_idx)
-        op_add_idx.add_output(val_idx_uint)
+        val_idx_uint = builder.emit(OpCode.ADD, [val_y_w, val_x], DataType.UINT)
         
         val_idx_int = builder.cast(val_idx_uint, DataType.INT)
         
-        ctx.set_output(2, val_idx_int)
+        values.append(val_idx_int)
 
-    if output_socket_needed:
-        req_key = ctx._get_socket_key(output_socket_needed)
-        if req_key in ctx._socket_value_map:
-            return ctx._socket_value_map[req_key]
-    return val_pos
+    return values
+
+
+def handle_position(node, ctx):
+    """Handle ComputeNodePosition node (see position_outputs)."""
+    output_socket_needed = ctx.extra.get('output_socket_needed')
+    
+    values = position_outputs(node, ctx.builder, output_socket_needed)
+    ctx.set_outputs(values)
+    
+    return ctx.requested_output(values[0])
 
 
 def handle_switch(node, ctx):
@@ -106,23 +113,17 @@ def handle_switch(node, ctx):
     builder = ctx.builder
     
     val_sw = ctx.input_float(0, default=0.0)
-    val_false = ctx.get_input(1)
-    val_true = ctx.get_input(2)
+    val_false, val_true = ctx.get_inputs((1, 2))
     
     if val_false is None: val_false = builder.constant(0.0, DataType.FLOAT)
     if val_true is None: val_true = builder.constant(0.0, DataType.FLOAT)
     
-    target_type = DataType.FLOAT
-    if node.data_type == 'VEC3': target_type = DataType.VEC3
-    elif node.data_type == 'RGBA': target_type = DataType.VEC4
+    target_type = _DATA_TYPE_TO_DT.get(node.data_type, DataType.FLOAT)
     
-    val_sw = builder.cast(val_sw, DataType.FLOAT)
     val_false = builder.cast(val_false, target_type)
     val_true = builder.cast(val_true, target_type)
     
-    op = builder.add_op(OpCode.SELECT, [val_false, val_true, val_sw])
-    val_res = builder._new_value(ValueKind.SSA, target_type, origin=op)
-    op.add_output(val_res)
+    val_res = builder.emit(OpCode.SELECT, [val_false, val_true, val_sw], target_type)
     
     ctx.set_output(0, val_res)
     return val_res
@@ -133,46 +134,28 @@ def handle_mix(node, ctx):
     builder = ctx.builder
     
     val_fac = ctx.input_float(0, default=0.5)
-    val_a = ctx.get_input(1)
-    val_b = ctx.get_input(2)
+    val_a, val_b = ctx.get_inputs((1, 2))
     
     if val_a is None: val_a = builder.constant(0.0, DataType.FLOAT)
     if val_b is None: val_b = builder.constant(0.0, DataType.FLOAT)
     
-    target_type = DataType.FLOAT
-    if node.data_type == 'VEC3': target_type = DataType.VEC3
-    elif node.data_type == 'RGBA': target_type = DataType.VEC4
+    target_type = _DATA_TYPE_TO_DT.get(node.data_type, DataType.FLOAT)
     
-    val_fac = builder.cast(val_fac, DataType.FLOAT)
     val_a = builder.cast(val_a, target_type)
     val_b = builder.cast(val_b, target_type)
     
-    val_blend = val_b
+    # Color blend modes other than MIX blend A and B before the mix
+    blend_opcode = None
+    if target_type is DataType.VEC4:
+        blend_opcode = _BLEND_OPCODES.get(getattr(node, 'blend_type', 'MIX'))
     
-    mode = 'MIX'
-    if hasattr(node, "blend_type") and node.data_type == 'RGBA':
-        mode = node.blend_type
-        
-    if mode == 'ADD':
-        op_add = builder.add_op(OpCode.ADD, [val_a, val_b])
-        val_blend = builder._new_value(ValueKind.SSA, target_type, origin=op_add)
-        op_add.add_output(val_blend)
-    elif mode == 'MULTIPLY':
-        op_mul = builder.add_op(OpCode.MUL, [val_a, val_b])
-        val_blend = builder._new_value(ValueKind.SSA, target_type, origin=op_mul)
-        op_mul.add_output(val_blend)
-    elif mode == 'SUBTRACT':
-        op_sub = builder.add_op(OpCode.SUB, [val_a, val_b])
-        val_blend = builder._new_value(ValueKind.SSA, target_type, origin=op_sub)
-        op_sub.add_output(val_blend)
-    elif mode == 'DIVIDE':
-        op_div = builder.add_op(OpCode.DIV, [val_a, val_b])
-        val_blend = builder._new_value(ValueKind.SSA, target_type, origin=op_div)
-        op_div.add_output(val_blend)
-    
-    op_mix = builder.add_op(OpCode.SELECT, [val_a, val_blend, val_fac])
-    val_res = builder._new_value(ValueKind.SSA, target_type, origin=op_mix)
-    op_mix.add_output(val_res)
+    if blend_opcode is None:
+        val_blend = val_b
+    else:
+        val_blend = builder.emit(blend_opcode, [val_a, val_b], target_type)
+    
+    # Linear interpolation a*(1-fac) + blend*fac, lowered to GLSL mix()
+    val_res = builder.emit(OpCode.MIX, [val_a, val_blend, val_fac], target_type)
     
     ctx.set_output(0, val_res)
     return val_res
@@ -11,10 +11,8 @@ from ...ir.types import DataType
 logger = logging.getLogger(__name__)
 
 
-def handle_image_input(node, ctx):
-    """Handle ComputeNodeImageInput node."""
-    builder = ctx.builder
-    
+def image_input_outputs(node, builder, output_socket_needed=None) -> list:
+    """Values of ComputeNodeImageInput's outputs (no inputs: leaf fast path)."""
     img = node.image
     if not img:
         val = builder.constant(0.0, DataType.FLOAT)
@@ -22,7 +20,12 @@ def handle_image_input(node, ctx):
         fmt = "rgba32f" if img.is_float else "rgba8"
         desc = ImageDesc(name=img.name, access=ResourceAccess.READ, format=fmt)
         val = builder.add_resource(desc)
-    
+    return [val]
+
+
+def handle_image_input(node, ctx):
+    """Handle ComputeNodeImageInput node."""
+    val = image_input_outputs(node, ctx.builder)[0]
     ctx.set_output(0, val)
     return val
 
@@ -57,10 +60,7 @@ def handle_image_info(node, ctx):
         val_dims = builder.constant(2, DataType.INT)
     
     # Map outputs: Width, Height, Depth, Dimensionality
-    ctx.set_output(0, val_width)
-    ctx.set_output(1, val_height)
-    ctx.set_output(2, val_depth)
-    ctx.set_output(3, val_dims)
+    ctx.set_outputs((val_width, val_height, val_depth, val_dims))
     
     return val_width
 
@@ -108,7 +108,7 @@ def handle_sample(node, ctx):
         # Adjust coordinate dimensionality based on target texture
         if target_is_3d:
             # For 3D textures, ensure VEC3
-            if val_coord.type == DataType.VEC2:
+            if val_coord.type is DataType.VEC2:
                 # Extend 2D coords to 3D with Z=0.5 (middle slice)
                 z_val = builder.constant(0.5, DataType.FLOAT)
                 val_coord = builder.combine_xyz(
@@ -116,19 +116,15 @@ def handle_sample(node, ctx):
                     builder.swizzle(val_coord, "y"),
                     z_val
                 )
-            elif val_coord.type == DataType.IVEC3:
+            elif val_coord.type is not DataType.VEC4:
+                # cast leaves VEC3 as-is
                 val_coord = builder.cast(val_coord, DataType.VEC3)
-            elif val_coord.type not in (DataType.VEC3, DataType.VEC4):
-                val_coord = builder.cast(val_coord, DataType.VEC3)
-            # VEC3 is preserved as-is
         else:
             # For 2D textures, ensure VEC2
-            if val_coord.type == DataType.VEC3:
+            if val_coord.type is DataType.VEC3:
                 # Flatten to 2D by taking XY
                 val_coord = builder.swizzle(val_coord, "xy")
-            elif val_coord.type == DataType.IVEC2:
-                val_coord = builder.cast(val_coord, DataType.VEC2)
-            elif val_coord.type != DataType.VEC2:
+            else:
                 val_coord = builder.cast(val_coord, DataType.VEC2)
         
         # Use sample() for texture() - enables bilinear filtering
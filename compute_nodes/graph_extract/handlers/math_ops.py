@@ -1,10 +1,39 @@
 # Math Node Handlers
 # Handles: ComputeNodeMath, ComputeNodeVectorMath
 
-from ...ir.graph import ValueKind
 from ...ir.ops import OpCode
 from ...ir.types import DataType
 
+# Built once at import rather than on every handler call
+_MATH_OP_MAP = {
+    'LESS_THAN': OpCode.LT,
+    'GREATER_THAN': OpCode.GT,
+    'MODULO': OpCode.MOD,
+}
+_MATH_TERNARY_OPS = frozenset({
+    OpCode.MULTIPLY_ADD, OpCode.WRAP, OpCode.COMPARE, OpCode.SMOOTH_MIN,
+    OpCode.SMOOTH_MAX, OpCode.CLAMP, OpCode.MIX,
+})
+
+_VECTOR_MATH_OP_MAP = {
+    'MINIMUM': OpCode.MIN,
+    'MAXIMUM': OpCode.MAX,
+    'MODULO': OpCode.MOD,
+    'SINE': OpCode.SIN,
+    'COSINE': OpCode.COS,
+    'TANGENT': OpCode.TAN,
+    'FRACTION': OpCode.FRACT,
+}
+_VECTOR_MATH_UNARY_OPS = frozenset({
+    OpCode.LENGTH, OpCode.NORMALIZE, OpCode.ABS, OpCode.FLOOR, OpCode.CEIL,
+    OpCode.FRACT, OpCode.SIN, OpCode.COS, OpCode.TAN,
+})
+_VECTOR_MATH_TERNARY_OPS = frozenset({
+    OpCode.MULTIPLY_ADD, OpCode.WRAP, OpCode.REFRACT, OpCode.FACEFORWARD,
+})
+# Vector Math operations with a scalar result (written to the Value output)
+_VECTOR_MATH_FLOAT_OPS = frozenset({OpCode.DOT, OpCode.DISTANCE, OpCode.LENGTH})
+
 
 def handle_math(node, ctx):
     """Handle ComputeNodeMath node (scalar math operations)."""
@@ -15,13 +44,7 @@ def handle_math(node, ctx):
     
     op_str = node.operation
     
-    op_map = {
-        'LESS_THAN': OpCode.LT,
-        'GREATER_THAN': OpCode.GT,
-        'MODULO': OpCode.MOD,
-    }
-    
-    opcode = op_map.get(op_str)
+    opcode = _MATH_OP_MAP.get(op_str)
     if opcode is None:
         opcode = getattr(OpCode, op_str, OpCode.ADD)
     
@@ -29,7 +52,7 @@ def handle_math(node, ctx):
 
     # Check for 3rd input (Ternary)
     # MULTIPLY_ADD, WRAP, MIX, etc.
-    if opcode in {OpCode.MULTIPLY_ADD, OpCode.WRAP, OpCode.COMPARE, OpCode.SMOOTH_MIN, OpCode.SMOOTH_MAX, OpCode.CLAMP, OpCode.MIX}:
+    if opcode in _MATH_TERNARY_OPS:
         if len(node.inputs) > 2:
             inputs.append(ctx.input_float(2))
     elif opcode == OpCode.COMPARE:
@@ -38,9 +61,7 @@ def handle_math(node, ctx):
 
     val_out = None
     try:
-        op = builder.add_op(opcode, inputs)
-        val_out = builder._new_value(ValueKind.SSA, DataType.FLOAT, origin=op)
-        op.add_output(val_out)
+        val_out = builder.emit(opcode, inputs, DataType.FLOAT)
     except TypeError as e:
         raise TypeError(f"Node '{node.name}': {e}") from e
     
@@ -57,30 +78,18 @@ def handle_vector_math(node, ctx):
     
     op_str = node.operation
     
-    op_map = {
-        'MINIMUM': OpCode.MIN,
-        'MAXIMUM': OpCode.MAX,
-        'MODULO': OpCode.MOD,
-        'SINE': OpCode.SIN,
-        'COSINE': OpCode.COS,
-        'TANGENT': OpCode.TAN,
-        'FRACTION': OpCode.FRACT,
-    }
-    opcode = op_map.get(op_str)
+    opcode = _VECTOR_MATH_OP_MAP.get(op_str)
     if opcode is None:
         opcode = getattr(OpCode, op_str, OpCode.ADD)
     
-    res_type = DataType.VEC3
-    is_float_out = False
-    
     inputs = [val_a, val_b]
     
     # Unary
-    if opcode in {OpCode.LENGTH, OpCode.NORMALIZE, OpCode.ABS, OpCode.FLOOR, OpCode.CEIL, OpCode.FRACT, OpCode.SIN, OpCode.COS, OpCode.TAN}:
+    if opcode in _VECTOR_MATH_UNARY_OPS:
         inputs = [val_a]
     
     # Ternary
-    if opcode in {OpCode.MULTIPLY_ADD, OpCode.WRAP, OpCode.REFRACT, OpCode.FACEFORWARD}:
+    if opcode in _VECTOR_MATH_TERNARY_OPS:
         if len(node.inputs) > 2:
             inputs.append(ctx.input_vec3(2))
     
@@ -97,26 +106,11 @@ def handle_vector_math(node, ctx):
             # IOR input
             inputs = [val_a, val_b, ctx.input_float(3, default=1.45)]
     
-    res_type = DataType.VEC3
-    is_float_out = False
-    
-    if opcode in {OpCode.DOT, OpCode.DISTANCE}:
-        res_type = DataType.FLOAT
-        is_float_out = True
-    elif opcode == OpCode.LENGTH:
-        res_type = DataType.FLOAT
-        is_float_out = True
-    elif opcode == OpCode.NORMALIZE:
-        res_type = DataType.VEC3
-    elif opcode == OpCode.CROSS:
-        res_type = DataType.VEC3
-    elif opcode == OpCode.REFLECT:
-        res_type = DataType.VEC3
+    is_float_out = opcode in _VECTOR_MATH_FLOAT_OPS
+    res_type = DataType.FLOAT if is_float_out else DataType.VEC3
     
     # Create Op
-    op = builder.add_op(opcode, inputs)
-    val_res = builder._new_value(ValueKind.SSA, res_type, origin=op)
-    op.add_output(val_res)
+    val_res = builder.emit(opcode, inputs, res_type)
     
     if is_float_out:
         ctx.set_output(1, val_res) # Value output
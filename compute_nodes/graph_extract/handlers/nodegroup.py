@@ -2,8 +2,11 @@
 # Handles: ComputeNodeGroup, ComputeNodeGroupInput, ComputeNodeGroupOutput
 
 from ...ir.types import DataType
+from ..node_context import _SOCKET_TYPE_TO_DT, NodeContext, default_constant, scope_id, socket_key
 
-# Note: get_handler is imported inside handle_nodegroup to avoid circular import
+# registry imports this module, so bind the module (already in sys.modules
+# while it initializes) and look handlers up through it at call time
+from .. import registry
 
 
 def handle_nodegroup(node, ctx):
@@ -57,7 +60,7 @@ def handle_nodegroup(node, ctx):
                         ptr = inner_socket.as_pointer()
                     else:
                         ptr = id(inner_socket)
-                    inner_key = (ptr, inner_scope)
+                    inner_key = socket_key(ptr, scope_id(inner_scope))
                     ctx._socket_value_map[inner_key] = outer_value
                     
                     # DEBUG LOG
@@ -92,17 +95,16 @@ def handle_nodegroup(node, ctx):
                 from_ptr = from_socket.as_pointer()
             else:
                 from_ptr = id(from_socket)
-            from_key = (from_ptr, new_scope)
+            new_sid = scope_id(new_scope)
+            from_key = socket_key(from_ptr, new_sid)
             
             if from_key in ctx._socket_value_map:
                 val = ctx._socket_value_map[from_key]
             else:
                 # Need to process the inner node
-                from ..registry import get_handler
-                handler = get_handler(from_node.bl_idname)
+                handler = registry.get_handler(from_node.bl_idname)
                 if handler:
                     # Create valid NodeContext for inner node
-                    from ..node_context import NodeContext
                     
                     # Merge parent context with local requirements
                     new_extra = ctx.extra.copy()
@@ -111,12 +113,12 @@ def handle_nodegroup(node, ctx):
                     
                     # Create SCOPE-AWARE closures for inner context
                     # This is critical: inner nodes must use the extended scope
-                    def inner_get_socket_key(socket, _scope=new_scope):
+                    def inner_get_socket_key(socket, _scope=new_scope, _sid=new_sid):
                         if hasattr(socket, "as_pointer"):
                             ptr = socket.as_pointer()
                         else:
                             ptr = id(socket)
-                        return (ptr, _scope)
+                        return socket_key(ptr, _sid)
                     
                     def inner_get_socket_value(socket, _scope=new_scope, _map=ctx._socket_value_map, _builder=builder, _parent_ctx=ctx):
                         key = inner_get_socket_key(socket, _scope)
@@ -136,10 +138,8 @@ def handle_nodegroup(node, ctx):
                                 return val
                             
                             # Process the upstream node
-                            from ..registry import get_handler
-                            handler = get_handler(from_node.bl_idname)
+                            handler = registry.get_handler(from_node.bl_idname)
                             if handler:
-                                from ..node_context import NodeContext
                                 upstream_extra = _parent_ctx.extra.copy()
                                 upstream_extra['output_socket_needed'] = from_socket
                                 upstream_extra['scope_path'] = list(_scope)
@@ -161,12 +161,8 @@ def handle_nodegroup(node, ctx):
                             return None
                         # For unlinked sockets, use default value
                         if hasattr(socket, "default_value"):
-                            from ...ir.types import DataType
-                            dtype = DataType.FLOAT
-                            if socket.type == 'VECTOR': dtype = DataType.VEC3
-                            elif socket.type == 'RGBA': dtype = DataType.VEC4
-                            elif socket.type == 'INT': dtype = DataType.INT
-                            val = _builder.constant(socket.default_value, dtype)
+                            dtype = _SOCKET_TYPE_TO_DT.get(socket.type, DataType.FLOAT)
+                            val = default_constant(_builder, socket.default_value, dtype)
                             _map[key] = val
                             return val
                         return None
@@ -189,21 +185,15 @@ def handle_nodegroup(node, ctx):
             result_values.append(val)
             
             # Map to outer output socket
-            if i < len(node.outputs):
-                outer_output_key = ctx._get_socket_key(node.outputs[i])
-                ctx._socket_value_map[outer_output_key] = val
+            ctx.set_output(i, val)
         else:
             # Not linked - use default value if any
             if hasattr(inner_socket, 'default_value'):
-                dtype = DataType.FLOAT
-                if inner_socket.type == 'VECTOR': dtype = DataType.VEC3
-                elif inner_socket.type == 'RGBA': dtype = DataType.VEC4
-                val = builder.constant(inner_socket.default_value, dtype)
+                dtype = _SOCKET_TYPE_TO_DT.get(inner_socket.type, DataType.FLOAT)
+                val = default_constant(builder, inner_socket.default_value, dtype)
                 result_values.append(val)
                 
-                if i < len(node.outputs):
-                    outer_output_key = ctx._get_socket_key(node.outputs[i])
-                    ctx._socket_value_map[outer_output_key] = val
+                ctx.set_output(i, val)
             else:
                 result_values.append(None)
     
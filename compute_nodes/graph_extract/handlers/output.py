@@ -94,9 +94,6 @@ def handle_output_image(node, ctx):
     val_target = builder.add_resource(desc)
     
     # Store save settings for executor to use
-    if not hasattr(builder.graph, 'output_image_settings'):
-        builder.graph.output_image_settings = {}
-    
     builder.graph.output_image_settings[output_name] = {
         'save_mode': save_mode,
         'filepath': filepath,
@@ -67,9 +67,7 @@ def handle_output_sequence(node, ctx):
         'color_depth': color_depth,
     }
     
-    # Store in graph metadata (we'll add this capability)
-    if not hasattr(builder.graph, 'sequence_outputs'):
-        builder.graph.sequence_outputs = []
+    # Store in graph metadata
     builder.graph.sequence_outputs.append(sequence_info)
     
     return val_data  # Return the input - nothing to generate in shader
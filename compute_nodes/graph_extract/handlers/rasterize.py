@@ -5,6 +5,7 @@
 from ...ir.ops import OpCode
 from ...ir.resources import ImageDesc, ResourceAccess
 from ...ir.types import DataType
+from ..node_context import _CAST_TO_VEC4
 
 
 def handle_capture(node, ctx):
@@ -17,25 +18,8 @@ def handle_capture(node, ctx):
     import logging
     logger = logging.getLogger(__name__)
     
-    # Get input value (Field)
-    # Using 'Field' key from inputs
-    # Handles default (black) and casting to VEC4 automatically
-    val_input = ctx.input_vec4('Field', default=(0.0, 0.0, 0.0, 1.0))
-    
-    if val_input.type == DataType.HANDLE:
-         # Special case: If input is a Grid (HANDLE), we need to sample it explicitly
-         # input_vec4 might have cast it? No, input_vec4 checks type. 
-         # Wait, input_vec4 logic:
-         # if val.type != DataType.VEC4: return self.builder.cast(val, DataType.VEC4)
-         # If builder.cast handles HANDLE->VEC4 (via sampling?), we are good.
-         # But the original code had explicit sampling logic for HANDLEs later (lines 132-140).
-         # Let's check if we should preserve the raw input if it's a HANDLE.
-         val_temp = ctx.get_input('Field')
-         if val_temp and val_temp.type == DataType.HANDLE:
-             val_input = val_temp
-         # If not handle, input_vec4 did the right thing.
-    
-    # Actually, let's keep it simple. `ctx.get_input` is safer if we have special type handling logic downstream.
+    # Get input value (Field or Grid). Read raw: Grids are loaded below and
+    # fields are widened to vec4 once, right before the store.
     val_input = ctx.get_input('Field')
     if val_input is None: 
          val_input = builder.constant((0.0, 0.0, 0.0, 1.0), DataType.VEC4)
@@ -177,9 +161,7 @@ def handle_capture(node, ctx):
         logger.info(f"Capture '{node.name}': marked as dynamic_size, expressions: {list(size_expression.keys())}")
     
     # Ensure input is VEC4 for storage
-    if val_input.type == DataType.VEC3:
-        val_input = builder.cast(val_input, DataType.VEC4)
-    elif val_input.type == DataType.FLOAT:
+    if val_input.type in _CAST_TO_VEC4:
         val_input = builder.cast(val_input, DataType.VEC4)
     elif val_input.type == DataType.HANDLE:
         # Input is already a Grid - sample it at current position
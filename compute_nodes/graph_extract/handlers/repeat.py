@@ -3,12 +3,17 @@
 # Handles: ComputeNodeRepeatInput, ComputeNodeRepeatOutput
 
 import logging
+from collections import deque
 from typing import Optional, Any, List, Dict
 
 from ...ir.graph import ValueKind
 from ...ir.ops import OpCode
 from ...ir.types import DataType
 from ...ir.resources import ImageDesc, ResourceAccess
+from ..node_context import NodeContext
+
+# registry imports this module; resolve handlers through it at call time
+from .. import registry
 
 
 logger = logging.getLogger(__name__)
@@ -47,7 +52,7 @@ def handle_repeat_output(node, ctx):
     builder = ctx.builder
     
     # Find paired RepeatInput
-    repeat_input = _find_repeat_input(node)
+    repeat_input = _find_repeat_input(ctx, node)
     
     if not repeat_input:
         logger.warning(f"Repeat Output '{node.name}' has no paired Repeat Input")
@@ -237,18 +242,16 @@ def handle_repeat_input(node, ctx):
         return socket_value_map[key_iteration]
     
     # Not yet processed - process paired RepeatOutput
-    paired_output = _find_repeat_output(node)
+    paired_output = _find_repeat_output(ctx, node)
     
     if paired_output:
-        from ..registry import get_handler
-        handler = get_handler(paired_output.bl_idname)
+        handler = registry.get_handler(paired_output.bl_idname)
         if handler:
             logger.debug(f"Triggering RepeatOutput processing from RepeatInput")
             
             # Create a temporary context for the paired node
             # This is critical REFACTOR point: we need to instantiate NodeContext here too
             # We reuse internal dependencies but swap node
-            from ..node_context import NodeContext
             ctx_paired = NodeContext(
                 builder=builder,
                 node=paired_output,
@@ -272,40 +275,74 @@ def handle_repeat_input(node, ctx):
     return builder.constant(0, DataType.INT)
 
 
-def _find_repeat_output(input_node):
-    if hasattr(input_node, 'paired_output') and input_node.paired_output:
-        tree = input_node.id_data
-        if input_node.paired_output in tree.nodes:
-            return tree.nodes[input_node.paired_output]
-    return None
+def _repeat_pairing(ctx, tree) -> Dict[str, Any]:
+    """
+    Node name -> paired Repeat zone node, for every Repeat Input/Output in tree.
+    
+    Built in one pass over the tree the first time one of its zones is
+    extracted and kept in the shared extraction state, so the lookups from
+    both ends of every zone are dict hits instead of upstream searches.
+    """
+    extraction_state = ctx.extra.setdefault('extraction_state', {})
+    pairings = extraction_state.setdefault('repeat_pairing', {})
+    pairing = pairings.get(tree.name)
+    if pairing is None:
+        pairing = pairings[tree.name] = _build_repeat_pairing(tree)
+    return pairing
+
+
+def _build_repeat_pairing(tree) -> Dict[str, Any]:
+    nodes = tree.nodes
+    pairing = {}
+    unpaired = []
+    for nd in nodes:
+        bl_idname = nd.bl_idname
+        if bl_idname == 'ComputeNodeRepeatInput':
+            partner = getattr(nd, 'paired_output', '')
+        elif bl_idname == 'ComputeNodeRepeatOutput':
+            partner = getattr(nd, 'paired_input', '')
+        else:
+            continue
+        if partner and partner in nodes:
+            pairing[nd.name] = nodes[partner]
+        elif bl_idname == 'ComputeNodeRepeatOutput':
+            unpaired.append(nd)
+    
+    if unpaired:
+        # Node name -> upstream nodes, read from the tree's link list once
+        # and shared by the searches of all unpaired outputs
+        upstream: Dict[str, List[Any]] = {}
+        for link in tree.links:
+            upstream.setdefault(link.to_node.name, []).append(link.from_node)
+        for nd in unpaired:
+            repeat_input = _search_upstream_repeat_input(nd, upstream)
+            if repeat_input is not None:
+                pairing[nd.name] = repeat_input
+    return pairing
+
+
+def _find_repeat_output(ctx, input_node):
+    return _repeat_pairing(ctx, input_node.id_data).get(input_node.name)
 
-def _find_repeat_input(output_node) -> Optional[Any]:
+
+def _find_repeat_input(ctx, output_node) -> Optional[Any]:
     """Find the paired RepeatInput for a RepeatOutput."""
-    if hasattr(output_node, 'paired_input') and output_node.paired_input:
-        tree = output_node.id_data
-        if output_node.paired_input in tree.nodes:
-            return tree.nodes[output_node.paired_input]
-    return _search_upstream_repeat_input(output_node)
+    return _repeat_pairing(ctx, output_node.id_data).get(output_node.name)
 
 
-def _search_upstream_repeat_input(start_node) -> Optional[Any]:
-    """Search upstream from a node to find RepeatInput."""
-    stack = list(start_node.inputs)
-    visited = set()
+def _search_upstream_repeat_input(start_node, upstream: Dict[str, List[Any]]) -> Optional[Any]:
+    """Search upstream from a node to find RepeatInput (nearest first)."""
+    queue = deque((start_node.name,))
+    visited = {start_node.name}
     
-    while stack:
-        sock = stack.pop()
-        sock_id = id(sock)
-        if sock_id in visited:
-            continue
-        visited.add(sock_id)
-        
-        if sock.is_linked:
-            link = sock.links[0]
-            nd = link.from_node
+    while queue:
+        for nd in upstream.get(queue.popleft(), ()):
+            # Checked on discovery, so the search stops at the first RepeatInput seen
             if nd.bl_idname == 'ComputeNodeRepeatInput':
                 return nd
-            for inp in nd.inputs:
-                stack.append(inp)
+            name = nd.name
+            if name not in visited:
+                visited.add(name)
+                queue.append(name)
     
     return None
@@ -1,7 +1,6 @@
 # Texture Node Handlers
 # Handles: ComputeNodeNoiseTexture, ComputeNodeWhiteNoise, ComputeNodeVoronoiTexture
 
-from ...ir.graph import ValueKind
 from ...ir.ops import OpCode
 from ...ir.types import DataType
 
@@ -9,11 +8,9 @@ from ...ir.types import DataType
 def handle_noise_texture(node, ctx):
     """Handle ComputeNodeNoiseTexture node."""
     builder = ctx.builder
-    output_socket_needed = ctx.extra.get('output_socket_needed')
     
     # Inputs: [Vector, W, Scale, Detail, Roughness, Lacunarity, Offset]
-    val_vec = ctx.get_input(0)
-    val_w = ctx.get_input(1)
+    val_vec, val_w = ctx.get_inputs((0, 1))
     val_scale = ctx.input_float(2, default=5.0)
     val_detail = ctx.input_float(3, default=2.0)
     val_rough = ctx.input_float(4, default=0.5)
@@ -24,12 +21,12 @@ def handle_noise_texture(node, ctx):
     if val_vec is None:
         val_gid = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
         val_vec = builder.cast(val_gid, DataType.VEC3)
-    elif val_vec.type != DataType.VEC3:
+    else:
         val_vec = builder.cast(val_vec, DataType.VEC3)
     
     if val_w is None:
         val_w = builder.constant(0.0, DataType.FLOAT)
-    elif val_w.type != DataType.FLOAT:
+    else:
         val_w = builder.cast(val_w, DataType.FLOAT)
     
     inputs = [val_vec, val_w, val_scale, val_detail, val_rough, val_lacu, val_offset]
@@ -39,29 +36,18 @@ def handle_noise_texture(node, ctx):
         'normalize': bool(node.normalize)     # Convert to bool
     }
     
-    op = builder.add_op(OpCode.NOISE, inputs, attrs)
-    
     # Outputs: Fac (Float), Color (Color/Vec4)
-    val_fac = builder._new_value(ValueKind.SSA, DataType.FLOAT, origin=op)
-    val_col = builder._new_value(ValueKind.SSA, DataType.VEC4, origin=op)
-    op.add_output(val_fac)
-    op.add_output(val_col)
+    val_fac, val_col = builder.emit_multi(OpCode.NOISE, inputs, (DataType.FLOAT, DataType.VEC4), attrs)
     
     # Map Sockets
-    ctx.set_output(0, val_fac)
-    ctx.set_output(1, val_col)
-    
-    if output_socket_needed:
-        req_key = ctx._get_socket_key(output_socket_needed)
-        if req_key in ctx._socket_value_map:
-            return ctx._socket_value_map[req_key]
-    return val_fac
+    ctx.set_outputs((val_fac, val_col))
+    
+    return ctx.requested_output(val_fac)
 
 
 def handle_white_noise(node, ctx):
     """Handle ComputeNodeWhiteNoise node."""
     builder = ctx.builder
-    output_socket_needed = ctx.extra.get('output_socket_needed')
     
     val_vec = ctx.get_input(0)
     val_w = ctx.input_float(1, default=0.0)
@@ -70,34 +56,23 @@ def handle_white_noise(node, ctx):
     if val_vec is None:
         val_gid = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
         val_vec = builder.cast(val_gid, DataType.VEC3)
-    elif val_vec.type != DataType.VEC3:
+    else:
         val_vec = builder.cast(val_vec, DataType.VEC3)
     
     inputs = [val_vec, val_w]
     attrs = {'dimensions': str(node.dim_mode)}  # Use dim_mode property!
     
-    op = builder.add_op(OpCode.WHITE_NOISE, inputs, attrs)
-    
     # Outputs
-    val_val = builder._new_value(ValueKind.SSA, DataType.FLOAT, origin=op)
-    val_col = builder._new_value(ValueKind.SSA, DataType.VEC4, origin=op)
-    op.add_output(val_val)
-    op.add_output(val_col)
-    
-    ctx.set_output(0, val_val)
-    ctx.set_output(1, val_col)
-    
-    if output_socket_needed:
-        req_key = ctx._get_socket_key(output_socket_needed)
-        if req_key in ctx._socket_value_map:
-            return ctx._socket_value_map[req_key]
-    return val_val
+    val_val, val_col = builder.emit_multi(OpCode.WHITE_NOISE, inputs, (DataType.FLOAT, DataType.VEC4), attrs)
+    
+    ctx.set_outputs((val_val, val_col))
+    
+    return ctx.requested_output(val_val)
 
 
 def handle_voronoi_texture(node, ctx):
     """Handle ComputeNodeVoronoiTexture node."""
     builder = ctx.builder
-    output_socket_needed = ctx.extra.get('output_socket_needed')
     
     # Inputs
     val_vec = ctx.get_input(0)
@@ -114,7 +89,7 @@ def handle_voronoi_texture(node, ctx):
     if val_vec is None:
         val_gid = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
         val_vec = builder.cast(val_gid, DataType.VEC3)
-    elif val_vec.type != DataType.VEC3:
+    else:
         val_vec = builder.cast(val_vec, DataType.VEC3)
     
     inputs = [val_vec, val_w, val_scale, val_detail, val_rough, val_lacu, val_smooth, val_exp, val_rand]
@@ -126,29 +101,11 @@ def handle_voronoi_texture(node, ctx):
         'normalize': bool(node.normalize)    # Convert to bool
     }
     
-    op = builder.add_op(OpCode.VORONOI, inputs, attrs)
-    
     # Outputs: Distance, Color, Position, W, Radius
-    val_dist = builder._new_value(ValueKind.SSA, DataType.FLOAT, origin=op)
-    val_col = builder._new_value(ValueKind.SSA, DataType.VEC4, origin=op)
-    val_pos = builder._new_value(ValueKind.SSA, DataType.VEC3, origin=op)
-    val_out_w = builder._new_value(ValueKind.SSA, DataType.FLOAT, origin=op)
-    val_rad = builder._new_value(ValueKind.SSA, DataType.FLOAT, origin=op)
-    
-    op.add_output(val_dist)
-    op.add_output(val_col)
-    op.add_output(val_pos)
-    op.add_output(val_out_w)
-    op.add_output(val_rad)
-    
-    ctx.set_output(0, val_dist)
-    ctx.set_output(1, val_col)
-    ctx.set_output(2, val_pos)
-    ctx.set_output(3, val_out_w)
-    ctx.set_output(4, val_rad)
-    
-    if output_socket_needed:
-        req_key = ctx._get_socket_key(output_socket_needed)
-        if req_key in ctx._socket_value_map:
-            return ctx._socket_value_map[req_key]
-    return val_dist
+    val_dist, val_col, val_pos, val_out_w, val_rad = builder.emit_multi(
+        OpCode.VORONOI, inputs,
+        (DataType.FLOAT, DataType.VEC4, DataType.VEC3, DataType.FLOAT, DataType.FLOAT), attrs)
+    
+    ctx.set_outputs((val_dist, val_col, val_pos, val_out_w, val_rad))
+    
+    return ctx.requested_output(val_dist)
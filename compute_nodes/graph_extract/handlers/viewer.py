@@ -4,6 +4,7 @@
 from ...ir.resources import ImageDesc, ResourceAccess
 from ...ir.types import DataType
 from ...ir.ops import OpCode
+from ..node_context import _CAST_TO_VEC4
 
 
 def handle_viewer(node, ctx):
@@ -65,9 +66,7 @@ def handle_viewer(node, ctx):
         # Field: use directly
         val_sampled = val_data
         # Convert to vec4 if needed
-        if val_data.type == DataType.FLOAT:
-            val_sampled = builder.cast(val_data, DataType.VEC4)
-        elif val_data.type == DataType.VEC3:
+        if val_data.type in _CAST_TO_VEC4:
             val_sampled = builder.cast(val_data, DataType.VEC4)
     
     # Store to grid
@@ -77,9 +76,6 @@ def handle_viewer(node, ctx):
     builder.image_store(val_output, val_coord, val_sampled)
     
     # Mark for viewer system
-    if not hasattr(builder.graph, 'viewer_outputs'):
-        builder.graph.viewer_outputs = {}
-    
     builder.graph.viewer_outputs[output_name] = {
         'node': node,
         'resource_index': val_output.resource_index,
@@ -1,13 +1,60 @@
-from typing import Any, Optional, Tuple, Dict, Callable
+from typing import Any, Optional, Tuple, Dict, Callable, Final
 from ..ir.graph import Value, ValueKind
 from ..ir.types import DataType
 from ..ir.ops import OpCode
 
+# Node-group scope paths interned to small ints, so socket_value_map keys are
+# single ints instead of (ptr, scope tuple) pairs. The root scope is 0.
+# Ids only mean something within one extraction; reset_scope_ids drops them.
+_SCOPE_IDS: Dict[tuple, int] = {(): 0}
+_PTR_MASK: Final = (1 << 48) - 1
+
+# Unlinked socket type -> DataType of its default value constant (FLOAT otherwise)
+_SOCKET_TYPE_TO_DT: Final[Dict[str, DataType]] = {
+    'VECTOR': DataType.VEC3,
+    'RGBA': DataType.VEC4,
+    'INT': DataType.INT,
+    'BOOLEAN': DataType.BOOL,
+}
+
+# Field types widened to vec4 (with a single CAST) before a grid store
+_CAST_TO_VEC4: Final = frozenset({DataType.FLOAT, DataType.VEC3})
+
+
+def default_constant(builder: Any, default: Any, dtype: DataType) -> Value:
+    """CONSTANT Value for an unlinked socket's default_value."""
+    if dtype is DataType.VEC3 or dtype is DataType.VEC4:
+        # bpy_prop_array isn't hashable; as a tuple it shares the builder's cached constant
+        default = tuple(default)
+    return builder.constant(default, dtype)
+
+
+def scope_id(scope) -> int:
+    """Interned id of a scope path (tuple or list of group node names)."""
+    scope = tuple(scope)
+    sid = _SCOPE_IDS.get(scope)
+    if sid is None:
+        sid = _SCOPE_IDS.setdefault(scope, len(_SCOPE_IDS))
+    return sid
+
+
+def reset_scope_ids() -> None:
+    """Forget every interned scope but the root, once an extraction is done."""
+    _SCOPE_IDS.clear()
+    _SCOPE_IDS[()] = 0
+
+
+def socket_key(ptr: int, sid: int = 0) -> int:
+    """Pack a socket pointer and a scope id into one socket_value_map key."""
+    return (sid << 48) | (ptr & _PTR_MASK)
+
 class NodeContext:
     """
     Context object passed to node handlers during graph extraction.
     Provides standardized access to inputs, outputs, and the IR builder.
     """
+    __slots__ = ('builder', 'node', '_socket_value_map', '_get_socket_key', '_get_socket_value', 'extra', '_out_keys')
+    
     def __init__(self, 
                  builder: Any, 
                  node: Any,
@@ -21,6 +68,8 @@ class NodeContext:
         self._get_socket_key = get_socket_key
         self._get_socket_value = get_socket_value
         self.extra = extra_ctx or {}
+        # socket_value_map keys of node.outputs, filled on the first indexed set_output
+        self._out_keys: Optional[Tuple[int, ...]] = None
 
     def get_input(self, key_or_index: Any) -> Optional[Value]:
         """Get raw input Value from socket name or index."""
@@ -29,56 +78,89 @@ class NodeContext:
                 return None
             socket = self.node.inputs[key_or_index]
         else:
-            if key_or_index not in self.node.inputs:
+            # One name lookup on the RNA collection instead of 'in' + subscript
+            socket = self.node.inputs.get(key_or_index)
+            if socket is None:
                 return None
-            socket = self.node.inputs[key_or_index]
             
         return self._get_socket_value(socket)
+
+    def get_inputs(self, keys) -> list:
+        """Raw input Values for several socket indices or names, in order (None if missing/unlinked)."""
+        inputs = self.node.inputs
+        count = len(inputs)
+        get_socket_value = self._get_socket_value
+        values = []
+        for key in keys:
+            if isinstance(key, int):
+                values.append(get_socket_value(inputs[key]) if key < count else None)
+            else:
+                socket = inputs.get(key)
+                values.append(get_socket_value(socket) if socket is not None else None)
+        return values
         
     def input_float(self, key: Any, default: float = 0.0) -> Value:
         val = self.get_input(key)
         if val is None:
             return self.builder.constant(float(default), DataType.FLOAT)
-        if val.type != DataType.FLOAT:
-            return self.builder.cast(val, DataType.FLOAT)
-        return val
+        return self.builder.cast(val, DataType.FLOAT)
 
     def input_int(self, key: Any, default: int = 0) -> Value:
         val = self.get_input(key)
         if val is None:
             return self.builder.constant(int(default), DataType.INT)
-        if val.type != DataType.INT:
-            return self.builder.cast(val, DataType.INT)
-        return val
+        return self.builder.cast(val, DataType.INT)
 
     def input_vec3(self, key: Any, default: Tuple[float, float, float] = (0.0, 0.0, 0.0)) -> Value:
         val = self.get_input(key)
         if val is None:
             return self.builder.constant(default, DataType.VEC3)
-        if val.type != DataType.VEC3:
-            return self.builder.cast(val, DataType.VEC3)
-        return val
+        return self.builder.cast(val, DataType.VEC3)
         
     def input_vec4(self, key: Any, default: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 1.0)) -> Value:
         val = self.get_input(key)
         if val is None:
             return self.builder.constant(default, DataType.VEC4)
-        if val.type != DataType.VEC4:
-            return self.builder.cast(val, DataType.VEC4)
-        return val
+        return self.builder.cast(val, DataType.VEC4)
+
+    def output_keys(self) -> Tuple[int, ...]:
+        """socket_value_map keys of the node's outputs, in socket order (computed once per node)."""
+        out_keys = self._out_keys
+        if out_keys is None:
+            get_socket_key = self._get_socket_key
+            out_keys = self._out_keys = tuple(get_socket_key(socket) for socket in self.node.outputs)
+        return out_keys
+
+    def set_outputs(self, values) -> None:
+        """Set the node's outputs in socket order; None entries and extra values are skipped."""
+        socket_value_map = self._socket_value_map
+        for key, value in zip(self.output_keys(), values):
+            if value is not None:
+                socket_value_map[key] = value
+
+    def requested_output(self, default: Optional[Value] = None) -> Optional[Value]:
+        """Value already set for the output socket the caller asked for, else default."""
+        socket = self.extra.get('output_socket_needed')
+        if socket:
+            socket_value_map = self._socket_value_map
+            req_key = self._get_socket_key(socket)
+            if req_key in socket_value_map:
+                return socket_value_map[req_key]
+        return default
 
     def set_output(self, key_or_index: Any, value: Value):
         """Set output Value for socket name or index."""
         if isinstance(key_or_index, int):
-            if key_or_index >= len(self.node.outputs):
+            out_keys = self.output_keys()
+            if key_or_index >= len(out_keys):
                 return
-            socket = self.node.outputs[key_or_index]
+            key = out_keys[key_or_index]
         else:
-            if key_or_index not in self.node.outputs:
+            socket = self.node.outputs.get(key_or_index)
+            if socket is None:
                 return
-            socket = self.node.outputs[key_or_index]
+            key = self._get_socket_key(socket)
             
-        key = self._get_socket_key(socket)
         self._socket_value_map[key] = value
 
     @property
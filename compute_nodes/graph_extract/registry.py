@@ -1,10 +1,10 @@
 # Node Handler Registry
 # Maps bl_idname -> handler function
 
-from .handlers.images import handle_image_input, handle_image_info, handle_sample
+from .handlers.images import handle_image_input, handle_image_info, handle_sample, image_input_outputs
 from .handlers.math_ops import handle_math, handle_vector_math
 from .handlers.textures import handle_noise_texture, handle_white_noise, handle_voronoi_texture
-from .handlers.control_flow import handle_position, handle_switch, handle_mix
+from .handlers.control_flow import handle_position, handle_switch, handle_mix, position_outputs
 from .handlers.repeat import handle_repeat_output, handle_repeat_input
 from .handlers.converter import handle_separate_xyz, handle_combine_xyz, handle_separate_color, handle_combine_color, handle_map_range, handle_clamp
 from .handlers.output import handle_output_image
@@ -15,7 +15,7 @@ from .handlers.viewer import handle_viewer
 from .handlers.nodegroup import handle_nodegroup, handle_group_input, handle_group_output
 from .handlers.reroute import handle_reroute
 
-from typing import Dict, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any
 from ..ir.graph import Value
 
 from .node_context import NodeContext
@@ -74,6 +74,16 @@ HANDLER_REGISTRY: Dict[str, HandlerType] = {
     'NodeReroute': handle_reroute,
 }
 
+# Leaf nodes (no input sockets) that can be evaluated without a NodeContext.
+# Signature: (node, builder, output_socket_needed) -> list of output Values in
+# socket order, None for outputs skipped because another socket was requested
+LeafFastPathType = Callable[[Any, Any, Any], List[Optional[Value]]]
+
+LEAF_FAST_PATH: Dict[str, LeafFastPathType] = {
+    'ComputeNodeImageInput': image_input_outputs,
+    'ComputeNodePosition': position_outputs,
+}
+
 def get_handler(bl_idname: str) -> Optional[HandlerType]:
     """Get handler function for a node type, or None if not found."""
     return HANDLER_REGISTRY.get(bl_idname)
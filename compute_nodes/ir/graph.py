@@ -1,10 +1,36 @@
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Sequence, Set, Tuple
 from enum import Enum, auto
 from dataclasses import dataclass, field
 
 from .types import DataType
 from .ops import OpCode, infer_binary_type
-from .resources import ResourceDesc, ResourceType
+from .resources import ResourceDesc, ResourceType, ImageDesc, ResourceAccess
+
+_SIDE_EFFECT_OPS = frozenset({OpCode.IMAGE_STORE, OpCode.BUFFER_WRITE})
+
+# Same-width signed/unsigned integer type pairs (both directions)
+_SIGN_REINTERPRET_PAIRS = frozenset(
+    pair
+    for signed, unsigned in (
+        (DataType.INT, DataType.UINT),
+        (DataType.IVEC2, DataType.UVEC2),
+        (DataType.IVEC3, DataType.UVEC3),
+        (DataType.IVEC4, DataType.UVEC4),
+    )
+    for pair in ((signed, unsigned), (unsigned, signed))
+)
+
+
+def _constant_key(val):
+    """
+    Cache key for a constant literal. Floats are keyed by their exact bits, so
+    -0.0 and 0.0 (equal and hash-equal in Python) don't share a constant.
+    """
+    if isinstance(val, float):
+        return (val.__class__, val.hex())
+    if isinstance(val, tuple):
+        return tuple(_constant_key(v) for v in val)
+    return (val.__class__, val)
 
 
 def _trace_resource_index(val: 'Value') -> Optional[int]:
@@ -77,6 +103,9 @@ class Value:
     Representation of a typed value in the SSA graph.
     Has a unique ID and a stable identity.
     """
+    # Graphs hold one Value per SSA result, so skip the per-instance __dict__
+    __slots__ = ('id', 'kind', 'type', 'origin', 'users', 'name_hint', 'resource_index')
+    
     def __init__(self, id: int, kind: ValueKind, type: DataType, origin: Optional['Op'] = None, name_hint: str = "", resource_index: Optional[int] = None):
         self.id = id
         self.kind = kind
@@ -95,6 +124,9 @@ class Op:
     """
     Data-driven Operation.
     """
+    # metadata is only assigned on loop ops; readers use getattr(op, 'metadata', {})
+    __slots__ = ('opcode', 'inputs', 'attrs', 'outputs', 'side_effects', 'metadata')
+    
     def __init__(self, opcode: OpCode, inputs: List[Value], attrs: Optional[Dict[str, Any]] = None):
         self.opcode = opcode
         self.inputs = inputs
@@ -104,9 +136,7 @@ class Op:
         self.outputs: List[Value] = []
         
         # Side effects?
-        self.side_effects = False
-        if opcode in {OpCode.IMAGE_STORE, OpCode.BUFFER_WRITE}:
-            self.side_effects = True
+        self.side_effects = opcode in _SIDE_EFFECT_OPS
 
         # Register usage
         for val in inputs:
@@ -184,6 +214,15 @@ class Graph:
         self._resource_map: Dict[ResourceDesc, int] = {} 
         # Arguments to the kernel (uniforms, resources mapped to args)
         self.arguments: List[Value] = []
+        # First written image with an explicit size; drives the execution resolution
+        self.primary_output: Optional[ImageDesc] = None
+        # Profiling, set per execution from the tree's toggle
+        self.profile_execution: bool = False
+        self.execution_time_total: float = 0.0
+        # Output metadata filled by the output/viewer/sequence handlers
+        self.output_image_settings: Dict[str, Dict[str, Any]] = {}
+        self.viewer_outputs: Dict[str, Dict[str, Any]] = {}
+        self.sequence_outputs: List[Dict[str, Any]] = []
 
 class IRBuilder:
     """
@@ -193,6 +232,16 @@ class IRBuilder:
         self.graph = graph
         self.active_block = graph.blocks[0]
         self._next_value_id = 0
+        # (dtype, _constant_key(value)) -> CONSTANT Value, so repeated literals share one op
+        self._const_cache: Dict[tuple, Value] = {}
+        # (name, dtype) -> BUILTIN Value; builtins are per-invocation inputs, so one op per pair suffices
+        self._builtin_cache: Dict[tuple, Value] = {}
+        # (source value id, dtype) -> CAST result; a value converts the same way
+        # for every consumer, so handlers casting it again reuse the first op
+        self._cast_cache: Dict[tuple, Value] = {}
+        # (source value id, mask) -> SWIZZLE result, e.g. the gl_GlobalInvocationID.xy
+        # store coordinate every output handler builds
+        self._swizzle_cache: Dict[tuple, Value] = {}
 
     def _new_value(self, kind: ValueKind, type: DataType, origin: Op = None, name_hint: str = "", resource_index: Optional[int] = None) -> Value:
         val = Value(self._next_value_id, kind, type, origin, name_hint, resource_index)
@@ -215,6 +264,11 @@ class IRBuilder:
             # Ensure unique internal map
             self.graph._resource_map[desc] = idx
             
+            if (self.graph.primary_output is None and isinstance(desc, ImageDesc)
+                    and desc.access & ResourceAccess.WRITE
+                    and desc.size != (0, 0)):
+                self.graph.primary_output = desc
+            
         val = self._new_value(ValueKind.ARGUMENT, type=DataType.HANDLE, name_hint=desc.name)
         val.resource_index = idx
         # We need to link this value to the resource desc.
@@ -228,17 +282,22 @@ class IRBuilder:
         return op
 
     def binary(self, opcode: OpCode, a: Value, b: Value) -> Value:
-        out_type = infer_binary_type(opcode, a.type, b.type)
-        op = self.add_op(opcode, [a, b])
-        out = self._new_value(ValueKind.SSA, out_type, origin=op)
-        op.add_output(out)
-        return out
+        return self.emit(opcode, [a, b], infer_binary_type(opcode, a.type, b.type))
 
     # Helpers for specific ops
     def add(self, a: Value, b: Value): return self.binary(OpCode.ADD, a, b)
     def mul(self, a: Value, b: Value): return self.binary(OpCode.MUL, a, b)
     
     def constant(self, val: Any, type: DataType) -> Value:
+        # Only plain Python scalars/tuples are cached; Blender-owned values
+        # (mathutils vectors, colors) can change after the call
+        key = None
+        if isinstance(val, (int, float, bool, tuple)):
+            key = (type, _constant_key(val))
+            cached = self._const_cache.get(key)
+            if cached is not None:
+                return cached
+        
         # Unified Constant handling: Always an Op
         op = self.add_op(OpCode.CONSTANT, [], attrs={'value': val})
         v = self._new_value(ValueKind.SSA, type, origin=op)
@@ -246,17 +305,29 @@ class IRBuilder:
         # User convention: "Const como Op". ValueKind.CONSTANT can be a label.
         v.kind = ValueKind.CONSTANT 
         op.add_output(v)
+        if key is not None:
+            self._const_cache[key] = v
         return v
 
     def builtin(self, name: str, type: DataType) -> Value:
-        """Creates a BUILTIN value (e.g. gl_GlobalInvocationID)."""
+        """Creates a BUILTIN value (e.g. gl_GlobalInvocationID), or returns the existing one."""
+        key = (name, type)
+        v = self._builtin_cache.get(key)
+        if v is not None:
+            return v
         op = self.add_op(OpCode.BUILTIN, [], attrs={'name': name})
         v = self._new_value(ValueKind.BUILTIN, type, origin=op, name_hint=name)
         op.add_output(v)
+        self._builtin_cache[key] = v
         return v
 
     def swizzle(self, val: Value, mask: str) -> Value:
-        """Creates a SWIZZLE op."""
+        """Creates a SWIZZLE op, or returns the existing one for (val, mask)."""
+        key = (val.id, mask)
+        cached = self._swizzle_cache.get(key)
+        if cached is not None:
+            return cached
+        
         # TODO: infer type size from mask length
         # For now MVP: assume UVEC2 if mask length 2, float if 1, etc.
         # This inference logic should be centralized but kept simple here.
@@ -271,16 +342,26 @@ class IRBuilder:
             # Fallback for floats
             res_type = getattr(DataType, f"VEC{new_len}") if new_len > 1 else DataType.FLOAT
             
-        op = self.add_op(OpCode.SWIZZLE, [val], attrs={'mask': mask})
-        v = self._new_value(ValueKind.SSA, res_type, origin=op)
-        op.add_output(v)
+        v = self.emit(OpCode.SWIZZLE, [val], res_type, attrs={'mask': mask})
+        self._swizzle_cache[key] = v
         return v
 
     def cast(self, val: Value, target_type: DataType) -> Value:
-        """Creates a CAST op."""
-        # If type matches, return as is? Or explicit no-op?
-        if val.type == target_type:
+        """Creates a CAST op, or returns val unchanged if it already has target_type."""
+        if val.type is target_type:
             return val
+        key = (val.id, target_type)
+        cached = self._cast_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Peephole: casting an int <-> uint conversion back to its source type
+        # round-trips bit-exactly in GLSL, so reuse the source
+        origin = val.origin
+        if origin is not None and origin.opcode is OpCode.CAST:
+            src = origin.inputs[0]
+            if src.type is target_type and (src.type, val.type) in _SIGN_REINTERPRET_PAIRS:
+                return src
         
         # We need an explicit OpCode for CAST or use Unary? 
         # Using separate CAST OpCode would be cleaner.
@@ -289,9 +370,8 @@ class IRBuilder:
         # Let's check ops.py... wait, we didn't add CAST yet.
         # We should use a placeholder or define it. 
         # Assuming we add OpCode.CAST to types/ops.
-        op = self.add_op(OpCode.CAST, [val], attrs={'type': target_type.name})
-        v = self._new_value(ValueKind.SSA, target_type, origin=op)
-        op.add_output(v)
+        v = self.emit(OpCode.CAST, [val], target_type, attrs={'type': target_type.name})
+        self._cast_cache[key] = v
         return v
 
     def image_store(self, image: Value, coord: Value, data: Value):
@@ -301,20 +381,14 @@ class IRBuilder:
         self.add_op(OpCode.IMAGE_STORE, [image, coord, data])
 
     def image_size(self, image: Value) -> Value:
-        op = self.add_op(OpCode.IMAGE_SIZE, [image])
         # imageSize returns ivec3 for consistent handling of 2D and 3D images
         # For 2D: returns (width, height, 1)
         # For 3D: returns (width, height, depth)
-        v = self._new_value(ValueKind.SSA, DataType.IVEC3, origin=op)
-        op.add_output(v)
-        return v
+        return self.emit(OpCode.IMAGE_SIZE, [image], DataType.IVEC3)
     
     def image_load(self, image: Value, coord: Value) -> Value:
         # imageLoad(img, ivec2) -> vec4
-        op = self.add_op(OpCode.IMAGE_LOAD, [image, coord])
-        v = self._new_value(ValueKind.SSA, DataType.VEC4, origin=op)
-        op.add_output(v)
-        return v
+        return self.emit(OpCode.IMAGE_LOAD, [image, coord], DataType.VEC4)
     
     def div(self, a: Value, b: Value) -> Value:
         """Division helper."""
@@ -322,12 +396,10 @@ class IRBuilder:
     
     def sample(self, sampler: Value, coord: Value) -> Value:
         """Texture sampling (texture(sampler, uv))."""
-        op = self.add_op(OpCode.SAMPLE, [sampler, coord])
-        v = self._new_value(ValueKind.SSA, DataType.VEC4, origin=op)
-        op.add_output(v)
-        return v
+        return self.emit(OpCode.SAMPLE, [sampler, coord], DataType.VEC4)
     
-    def emit(self, opcode: OpCode, inputs: List[Value], result_type: DataType) -> Value:
+    def emit(self, opcode: OpCode, inputs: List[Value], result_type: DataType,
+             attrs: Dict[str, Any] = None) -> Value:
         """
         Generic emit for any operation with a single output.
         
@@ -335,12 +407,41 @@ class IRBuilder:
             opcode: The operation code
             inputs: List of input values
             result_type: The type of the result value
+            attrs: Optional op attributes
             
         Returns:
             The output Value
         """
-        op = self.add_op(opcode, inputs)
-        v = self._new_value(ValueKind.SSA, result_type, origin=op)
-        op.add_output(v)
+        # Single-output fast path: add_op/_new_value/add_output inlined, since
+        # nearly every op the builder creates goes through here
+        op = Op(opcode, inputs, attrs)
+        self.active_block.ops.append(op)
+        v = Value(self._next_value_id, ValueKind.SSA, result_type, op)
+        self._next_value_id += 1
+        op.outputs.append(v)
         return v
 
+    def emit_multi(self, opcode: OpCode, inputs: List[Value], result_types: Sequence[DataType],
+                   attrs: Dict[str, Any] = None, name_hints: Sequence[str] = ()) -> Tuple[Value, ...]:
+        """
+        Generic emit for an operation with several outputs (SEPARATE_XYZ, textures).
+        
+        Args:
+            opcode: The operation code
+            inputs: List of input values
+            result_types: Types of the output values, in output order
+            attrs: Optional op attributes
+            name_hints: Optional name hints, matched to result_types by position
+            
+        Returns:
+            The output Values, in output order
+        """
+        op = self.add_op(opcode, inputs, attrs)
+        name_hints = tuple(name_hints) + ("",) * (len(result_types) - len(name_hints))
+        values = tuple(
+            self._new_value(ValueKind.SSA, result_type, origin=op, name_hint=name_hint)
+            for result_type, name_hint in zip(result_types, name_hints)
+        )
+        op.outputs.extend(values)
+        return values
+
@@ -117,6 +117,9 @@ class OpCode(Enum):
     BUILTIN = auto()     # gl_GlobalInvocationID, etc.
     ARGUMENT = auto()    # Reference to a resource/uniform arg
 
+    # Identity hash in C for opcode-keyed dispatch tables (see DataType)
+    __hash__ = object.__hash__
+
 def infer_arithmetic_type(opcode: OpCode, a: DataType, b: DataType) -> DataType:
     """Infers type for basic arithmetic (ADD, SUB, MUL, DIV)."""
     if a == b:
@@ -1,4 +1,4 @@
-from enum import Enum, auto
+from enum import Enum, IntFlag, auto
 from dataclasses import dataclass, field
 from typing import Optional
 from .types import DataType
@@ -10,10 +10,11 @@ class ResourceType(Enum):
     IMAGE_3D = auto()   # Storage 3D (imageLoad/Store) - for volumes
     BUFFER_1D = auto()  # Storage buffer (SSBO) or Uniform Buffer (UBO) - future
 
-class ResourceAccess(Enum):
-    READ = auto()
-    WRITE = auto()
-    READ_WRITE = auto()
+class ResourceAccess(IntFlag):
+    # Bit flags so write-ness is a single `access & ResourceAccess.WRITE` test
+    READ = 1
+    WRITE = 2
+    READ_WRITE = 3
 
 @dataclass(unsafe_hash=True)
 class ResourceDesc:
@@ -27,42 +27,55 @@ class DataType(Enum):
     # NOTE: Resources (Image, Buffer) are no longer DataTypes. 
     # They are Resources handled by ResourceDesc.
 
+    # The lookup sets are module-level (see below) so these don't rebuild a
+    # set of members on every call.
     def is_vector(self):
-        return self in {
-            DataType.VEC2, DataType.VEC3, DataType.VEC4,
-            DataType.IVEC2, DataType.IVEC3, DataType.IVEC4,
-            DataType.UVEC2, DataType.UVEC3, DataType.UVEC4
-        }
+        return self in _VECTOR_TYPES
 
     def is_scalar(self):
-        return self in {DataType.FLOAT, DataType.INT, DataType.UINT, DataType.BOOL}
+        return self in _SCALAR_TYPES
     
     def is_integer(self):
         """Returns True if the type is based on integer (signed or unsigned)."""
-        return self in {
-            DataType.INT, DataType.UINT,
-            DataType.IVEC2, DataType.IVEC3, DataType.IVEC4,
-            DataType.UVEC2, DataType.UVEC3, DataType.UVEC4
-        }
+        return self in _INTEGER_TYPES
         
     def is_unsigned(self):
-        return self in {
-            DataType.UINT,
-            DataType.UVEC2, DataType.UVEC3, DataType.UVEC4
-        }
+        return self in _UNSIGNED_TYPES
 
     def component_count(self):
-        if self in {DataType.VEC2, DataType.IVEC2, DataType.UVEC2}: return 2
-        if self in {DataType.VEC3, DataType.IVEC3, DataType.UVEC3}: return 3
-        if self in {DataType.VEC4, DataType.IVEC4, DataType.UVEC4}: return 4
-        return 1
+        return _COMPONENT_COUNT.get(self, 1)
 
     def base_type(self):
         """Returns the scalar type of the vector components."""
-        if self in {DataType.VEC2, DataType.VEC3, DataType.VEC4}: return DataType.FLOAT
-        if self in {DataType.IVEC2, DataType.IVEC3, DataType.IVEC4}: return DataType.INT
-        if self in {DataType.UVEC2, DataType.UVEC3, DataType.UVEC4}: return DataType.UINT
-        return self
+        return _BASE_TYPE.get(self, self)
 
     def __str__(self):
         return self.name.lower()
+    
+    # Members are singletons compared by identity, so the C-level identity hash
+    # is valid and skips Enum's Python-level __hash__ on every type-keyed lookup.
+    __hash__ = object.__hash__
+
+
+_VECTOR_TYPES = frozenset({
+    DataType.VEC2, DataType.VEC3, DataType.VEC4,
+    DataType.IVEC2, DataType.IVEC3, DataType.IVEC4,
+    DataType.UVEC2, DataType.UVEC3, DataType.UVEC4,
+})
+_SCALAR_TYPES = frozenset({DataType.FLOAT, DataType.INT, DataType.UINT, DataType.BOOL})
+_INTEGER_TYPES = frozenset({
+    DataType.INT, DataType.UINT,
+    DataType.IVEC2, DataType.IVEC3, DataType.IVEC4,
+    DataType.UVEC2, DataType.UVEC3, DataType.UVEC4,
+})
+_UNSIGNED_TYPES = frozenset({DataType.UINT, DataType.UVEC2, DataType.UVEC3, DataType.UVEC4})
+_COMPONENT_COUNT = {
+    DataType.VEC2: 2, DataType.IVEC2: 2, DataType.UVEC2: 2,
+    DataType.VEC3: 3, DataType.IVEC3: 3, DataType.UVEC3: 3,
+    DataType.VEC4: 4, DataType.IVEC4: 4, DataType.UVEC4: 4,
+}
+_BASE_TYPE = {
+    DataType.VEC2: DataType.FLOAT, DataType.VEC3: DataType.FLOAT, DataType.VEC4: DataType.FLOAT,
+    DataType.IVEC2: DataType.INT, DataType.IVEC3: DataType.INT, DataType.IVEC4: DataType.INT,
+    DataType.UVEC2: DataType.UINT, DataType.UVEC3: DataType.UINT, DataType.UVEC4: DataType.UINT,
+}
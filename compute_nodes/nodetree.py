@@ -124,6 +124,10 @@ class ComputeNodeTree(NodeTree):
 
         # 2. Sync Reroute Nodes (Visual Fix)
         self._sync_reroute_nodes()
+        
+        # Topology changed: output nodes may have been added or removed
+        from .graph_extract import invalidate_output_nodes
+        invalidate_output_nodes(self)
 
         # 3. Auto Execute
         if getattr(self, "auto_execute", False):
@@ -1,4 +1,6 @@
 
+import traceback
+
 import bpy
 from .graph_extract import extract_graph
 from .planner.passes import ComputePass
@@ -7,6 +9,7 @@ from .ir.resources import ImageDesc
 from .planner.scheduler import schedule_passes
 from .codegen.glsl import ShaderGenerator
 from .runtime import TextureManager, ShaderManager, ComputeExecutor
+from .runtime.shaders import source_digest
 
 
 # =============================================================================
@@ -22,6 +25,8 @@ class ExecutionContext:
     - Testable: can be mocked/injected in tests
     - Stateless between executions: no stale data issues
     """
+    __slots__ = ("texture_mgr", "shader_mgr", "executor")
+    
     _instance = None  # Optional cached instance for performance
     
     def __init__(self, fresh: bool = False):
@@ -47,6 +52,8 @@ class ExecutionContext:
     @classmethod
     def get(cls, fresh: bool = False) -> 'ExecutionContext':
         """Factory method to get an execution context."""
+        if not fresh and cls._instance is not None:
+            return cls._instance
         return cls(fresh=fresh)
     
     @classmethod
@@ -57,22 +64,197 @@ class ExecutionContext:
 
 def get_executor():
     """Backward-compatible accessor for executor."""
-    return ExecutionContext.get().executor
+    ctx = ExecutionContext._instance
+    if ctx is None:
+        ctx = ExecutionContext()
+    return ctx.executor
+
+
+def _flatten_passes(items):
+    """Yield the ComputePasses of passes and (nested) PassLoops, in schedule order."""
+    work = list(reversed(items))
+    while work:
+        item = work.pop()
+        if isinstance(item, PassLoop):
+            # Body passes inside the loop
+            work.extend(reversed(item.body_passes))
+        else:
+            # Regular ComputePass
+            yield item
+
+
+def _generate_shaders(passes, graph):
+    """Generate GLSL for every pass (including PassLoop bodies)."""
+    generator = ShaderGenerator(graph)
+    for compute_pass in _flatten_passes(passes):
+        compute_pass.source = generator.generate(compute_pass)
+        compute_pass.display_source = compute_pass.source
+        compute_pass.source_digest = source_digest(compute_pass.source)
+
+# Extracted graph + schedule per tree, reused while the tree fingerprint is unchanged
+# tree pointer -> (fingerprint, graph, passes, [(ImageDesc, size, format), ...]).
+# Cleared on file load and unregister so deleted trees don't stay alive.
+_GRAPH_CACHE = {}
+
+_BASE_NODE_PROPS = None
+# Node bl_idname -> identifiers of its own (non-base) RNA properties
+_NODE_PROPS = {}
 
 
-def _generate_shader_for_item(item, generator):
-    """Recursively generate GLSL for passes and PassLoops."""
-    if isinstance(item, PassLoop):
-        # Generate shaders for all body passes inside the loop
-        for body_pass in item.body_passes:
-            _generate_shader_for_item(body_pass, generator)
-    else:
-        # Regular ComputePass
-        item.source = generator.generate(item)
-        item.display_source = item.source
+def _fingerprint_value(value, seen):
+    """
+    Comparable stand-in for a node property or socket default value.
+    
+    Values are tagged with their type so that 0, 0.0 and False stay distinct,
+    and floats are keyed by their exact bits (hex) so -0.0 != 0.0.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return ('float', value.hex())
+    if isinstance(value, (bool, int, str)):
+        return (type(value).__name__, value)
+    if isinstance(value, (set, frozenset)):
+        # Enum flag properties
+        return ('set', tuple(sorted(value)))
+    if hasattr(value, 'nodes') and hasattr(value, 'links'):
+        # Node group tree: its contents matter, not just the pointer
+        return ('tree', _tree_fingerprint(value, seen))
+    if hasattr(value, 'as_pointer'):
+        # ID datablocks (images) and collection items (repeat zone states):
+        # extraction reads their name, and size and float-ness for images
+        return ('ptr', value.as_pointer(), getattr(value, 'name', None),
+                tuple(getattr(value, 'size', ())), getattr(value, 'is_float', None))
+    try:
+        items = tuple(value)
+    except TypeError:
+        return ('repr', repr(value))
+    return (type(value).__name__,) + tuple(_fingerprint_value(item, seen) for item in items)
+
+
+def _node_props(node):
+    """Identifiers of node's own RNA properties, looked up once per node type."""
+    global _BASE_NODE_PROPS
+    props = _NODE_PROPS.get(node.bl_idname)
+    if props is None:
+        if _BASE_NODE_PROPS is None:
+            # Generic Node properties (location, label, ...) don't affect the graph
+            _BASE_NODE_PROPS = {p.identifier for p in bpy.types.Node.bl_rna.properties}
+        props = _NODE_PROPS[node.bl_idname] = tuple(
+            p.identifier for p in node.bl_rna.properties if p.identifier not in _BASE_NODE_PROPS
+        )
+    return props
+
+
+def _tree_fingerprint(tree, seen=None) -> tuple:
+    """
+    Cheap summary of what graph extraction reads from a tree: node pointers,
+    types and properties, socket types and default values, and links.
+    
+    Socket types cover interface and repeat-state type changes, since those
+    re-type the sockets of the nodes that expose them. The full tuple is
+    compared, not its hash, so a hash collision can't reuse a stale graph.
+    """
+    seen = seen if seen is not None else set()
+    tree_ptr = tree.as_pointer()
+    if tree_ptr in seen:
+        return ('ref', tree_ptr)
+    seen.add(tree_ptr)
+    
+    parts = []
+    for node in tree.nodes:
+        parts.append((node.as_pointer(), node.bl_idname))
+        for identifier in _node_props(node):
+            parts.append(_fingerprint_value(getattr(node, identifier, None), seen))
+        for sock in node.inputs:
+            parts.append((sock.bl_idname, _fingerprint_value(getattr(sock, 'default_value', None), seen)))
+        parts.append(tuple(sock.bl_idname for sock in node.outputs))
+    for link in tree.links:
+        parts.append((link.from_socket.as_pointer(), link.to_socket.as_pointer()))
+    return tuple(parts)
+
+
+def _extract_and_schedule(tree):
+    """Extract, schedule and generate GLSL for a tree, reusing the cached result if unchanged."""
+    from .logger import log_info
+    
+    tree_ptr = tree.as_pointer()
+    fingerprint = _tree_fingerprint(tree)
+    cached = _GRAPH_CACHE.get(tree_ptr)
+    if cached is not None and cached[0] == fingerprint:
+        _, graph, passes, resource_state = cached
+        # Execution fills in sizes/formats on the descriptors; start from the extracted ones
+        for res, size, fmt in resource_state:
+            res.size = size
+            res.format = fmt
+        log_info(f"Reusing extracted graph for {tree.name}")
+        return graph, passes
+    
+    # 1. Extract Graph
+    log_info(f"Extracting graph from {tree.name}...")
+    graph = extract_graph(tree)
+    
+    # 2. Analysis & Planning
+    passes = schedule_passes(graph)
+    
+    # 3. Code Generation (handles PassLoop recursively)
+    _generate_shaders(passes, graph)
+    
+    resource_state = [(res, res.size, res.format) for res in graph.resources if isinstance(res, ImageDesc)]
+    _GRAPH_CACHE[tree_ptr] = (fingerprint, graph, passes, resource_state)
+    return graph, passes
+
 
 _is_executing = False
 
+def _execute_impl(tree, context):
+    """Extract (or reuse), schedule and run a tree; returns the number of passes."""
+    # Setup Logging
+    from .logger import setup_logger
+    setup_logger()  # Default to INFO
+    
+    # 1-3. Extract Graph, Plan and Generate Code (cached per tree)
+    graph, passes = _extract_and_schedule(tree)
+        
+    # 4. Execution
+    executor = get_executor()
+    
+    # Resolution Handling - Use ImageDesc.size directly (image may not exist yet)
+    width, height = 512, 512  # Fallback
+    
+    # First sized write target, tagged at extraction (set by Output node properties)
+    if graph.primary_output is not None:
+        width, height = graph.primary_output.size[:2]
+    
+    # Fallback to scene resolution if still default
+    if width == 512 and height == 512:
+        render = context.scene.render
+        scale = render.resolution_percentage / 100.0
+        width = int(render.resolution_x * scale)
+        height = int(render.resolution_y * scale)
+
+    # PROFILING: Propagate settings to Graph
+    profiling = graph.profile_execution = tree.profile_execution if hasattr(tree, 'profile_execution') else False
+    if profiling:
+        graph.execution_time_total = 0.0
+        # Reset node times? Done by executor overwriting, but good ensuring validity
+        
+    executor.execute_graph(graph, passes, context_width=width, context_height=height)
+    
+    # PROFILING: Sync results back to Tree
+    if profiling:
+        tree.execution_time_total = graph.execution_time_total
+    
+    # Force redraw (if UI is available)
+    if hasattr(context, "window_manager") and context.window_manager:
+        for window in context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'IMAGE_EDITOR' or area.type == 'VIEW_3D':
+                    area.tag_redraw()
+                
+    return len(passes)
+
+
 def execute_compute_tree(tree, context):
     """Core execution logic for a Compute Node Tree"""
     global _is_executing
@@ -81,68 +263,10 @@ def execute_compute_tree(tree, context):
         
     _is_executing = True
     try:
-        # Setup Logging
-        from .logger import setup_logger, log_info
-        setup_logger()  # Default to INFO
-        
-        # 1. Extract Graph
-        log_info(f"Extracting graph from {tree.name}...")
-        graph = extract_graph(tree)
-        
-        # 2. Analysis & Planning
-        passes = schedule_passes(graph)
-        
-        # 3. Code Generation (handles PassLoop recursively)
-        generator = ShaderGenerator(graph)
-        for p in passes:
-            _generate_shader_for_item(p, generator)
-            
-        # 4. Execution
-        executor = get_executor()
-        
-        # Resolution Handling - Use ImageDesc.size directly (image may not exist yet)
-        width, height = 512, 512  # Fallback
-        
-        for res in graph.resources:
-            if isinstance(res, ImageDesc) and res.access.name in {'WRITE', 'READ_WRITE'}:
-                # Use the size from the ImageDesc (set by Output node properties)
-                if res.size != (0, 0):
-                    width = res.size[0]
-                    height = res.size[1]
-                    break
-        
-        # Fallback to scene resolution if still default
-        if width == 512 and height == 512:
-            render = context.scene.render
-            scale = render.resolution_percentage / 100.0
-            width = int(render.resolution_x * scale)
-            height = int(render.resolution_y * scale)
-
-        # PROFILING: Propagate settings to Graph
-        graph.profile_execution = getattr(tree, 'profile_execution', False)
-        if graph.profile_execution:
-            graph.execution_time_total = 0.0
-            # Reset node times? Done by executor overwriting, but good ensuring validity
-            
-        executor.execute_graph(graph, passes, context_width=width, context_height=height)
-        
-        # PROFILING: Sync results back to Tree
-        if graph.profile_execution:
-            tree.execution_time_total = getattr(graph, 'execution_time_total', 0.0)
-        
-        # Force redraw (if UI is available)
-        if hasattr(context, "window_manager") and context.window_manager:
-            for window in context.window_manager.windows:
-                for area in window.screen.areas:
-                    if area.type == 'IMAGE_EDITOR' or area.type == 'VIEW_3D':
-                        area.tag_redraw()
-                    
-        return len(passes)
-        
-    except Exception as e:
-        import traceback
+        return _execute_impl(tree, context)
+    except Exception:
         traceback.print_exc()
-        raise e
+        raise
     finally:
         _is_executing = False
 
@@ -169,7 +293,6 @@ class ComputeExecuteOperator(bpy.types.Operator):
         except Exception as e:
             from .logger import log_error
             log_error(f"Execution Failed: {e}")
-            import traceback
             traceback.print_exc()
             
             self.report({'ERROR'}, f"Execution Failed: {e}")
@@ -178,6 +301,11 @@ class ComputeExecuteOperator(bpy.types.Operator):
 from bpy.app.handlers import persistent
 
 
+@persistent
+def _clear_graph_cache(*args):
+    _GRAPH_CACHE.clear()
+
+
 
 
 
@@ -426,6 +554,9 @@ classes = (
 )
 
 def register():
+    if _clear_graph_cache not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_clear_graph_cache)
+    
     for cls in classes:
         # Check if native panel is registered, unregister it locally to avoid warning?
         # Actually re-registering overwrites it, which is what we want.
@@ -436,6 +567,10 @@ def register():
             bpy.utils.register_class(cls)
 
 def unregister():
+    if _clear_graph_cache in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_clear_graph_cache)
+    _GRAPH_CACHE.clear()
+    
     for cls in reversed(classes):
         try:
             bpy.utils.unregister_class(cls)
@@ -27,6 +27,12 @@ class ComputePass:
         # Shader Source
         self.source: str = ""
         self.display_source: Optional[str] = None
+        
+        # Shader cache key parts, so dispatches don't recompute them:
+        # content hash of source (set at codegen) and resource bindings
+        # (set by the executor once resource formats are resolved)
+        self.source_digest: Optional[bytes] = None
+        self.bindings: Optional[tuple] = None
 
     def add_op(self, op: Op):
         self.ops.append(op)
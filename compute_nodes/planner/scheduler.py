@@ -9,7 +9,7 @@ from .loops import PassLoop, find_loop_regions, wrap_passes_in_loops
 
 # Ops that are "pure" field operations - no side effects, safe to duplicate
 # These ops can be safely copied into multiple passes when their output is used across pass boundaries
-PURE_FIELD_OPS = {
+PURE_FIELD_OPS = frozenset({
     # Arithmetic
     OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.MOD,
     OpCode.MULTIPLY_ADD, OpCode.WRAP, OpCode.SNAP, OpCode.PINGPONG,
@@ -46,7 +46,7 @@ PURE_FIELD_OPS = {
     
     # Inputs (constants and builtins are always safe)
     OpCode.CONSTANT, OpCode.BUILTIN,
-}
+})
 
 
 
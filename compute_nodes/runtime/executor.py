@@ -98,6 +98,7 @@ class ComputeExecutor:
         # Phase 0: Resolve STATIC resources
         texture_map = self.resolver.resolve_static(graph, self._state)
         logger.debug(f"Phase 0: {len(texture_map)} static resources resolved")
+        self._clear_bindings(passes)
         
         # Phase 0.5: Execute PRE-LOOP passes (independent of loop outputs)
         for pass_ in pre_loop_passes:
@@ -118,6 +119,7 @@ class ComputeExecutor:
         if self.resolver.get_pending_resources():
             texture_map = self.resolver.resolve_pending(graph, self._state, texture_map)
             logger.debug(f"Phase 2: Pending resources resolved with post-loop sizes")
+            self._clear_bindings(post_loop_passes)
         
         # Phase 3: Execute POST-LOOP passes
         for pass_ in post_loop_passes:
@@ -129,17 +131,33 @@ class ComputeExecutor:
         self.resolver.readback_results(graph, texture_map)
         
         # Phase 5: Write sequence outputs (Grid3D -> Z-slice files)
-        if hasattr(graph, 'sequence_outputs') and graph.sequence_outputs:
+        if graph.sequence_outputs:
             self.sequence_exporter.write_sequence_outputs(graph, texture_map)
         
         # Phase 6: Register GPU-only viewer draw handlers
-        if hasattr(graph, 'viewer_outputs') and graph.viewer_outputs:
+        if graph.viewer_outputs:
             self._register_viewer_handlers(graph, texture_map)
         
         # Phase 7: Release all dynamic pool textures for reuse
         self.resolver.cleanup()
         logger.debug("Graph execution completed")
     
+    def _clear_bindings(self, passes):
+        """
+        Drop the stored shader bindings of passes (and PassLoop bodies).
+        
+        Resolution can change resource formats (e.g. written Blender images
+        become RGBA32F), so bindings are rebuilt once per resolution by the
+        pass runner instead of being trusted from a previous execution.
+        """
+        work = list(passes)
+        while work:
+            item = work.pop()
+            if isinstance(item, PassLoop):
+                work.extend(item.body_passes)
+            else:
+                item.bindings = None
+
     def _partition_passes(self, passes) -> Tuple[List, List, List]:
         """
         Partition passes into pre-loop, loops, and post-loop.
@@ -19,6 +19,7 @@ import logging
 import gpu
 
 from ..planner.passes import ComputePass
+from .shaders import source_digest, shader_bindings
 from ..errors import ShaderCompileError, TextureBindError, DispatchError
 
 logger = logging.getLogger(__name__)
@@ -107,7 +108,7 @@ class PassRunner:
         self._set_uniforms(shader, dispatch_w, dispatch_h, dispatch_d)
         
         # 5. DISPATCH
-        profiling = getattr(graph, 'profile_execution', False)
+        profiling = graph.profile_execution
         self._dispatch(shader, compute_pass, graph, dispatch_w, dispatch_h, dispatch_d, profiling)
         
         # 6. MEMORY BARRIER
@@ -127,14 +128,21 @@ class PassRunner:
             gen = ShaderGenerator(graph)
             src = gen.generate(compute_pass)
             compute_pass.source = src
+            compute_pass.source_digest = None
+        
+        if compute_pass.source_digest is None:
+            compute_pass.source_digest = source_digest(src)
+        if compute_pass.bindings is None:
+            compute_pass.bindings = shader_bindings(
+                graph.resources, compute_pass.reads_idx, compute_pass.writes_idx
+            )
         
         try:
             return self.shader_mgr.get_shader(
                 src,
-                resources=graph.resources,
-                reads_idx=compute_pass.reads_idx,
-                writes_idx=compute_pass.writes_idx,
-                dispatch_size=compute_pass.dispatch_size
+                dispatch_size=compute_pass.dispatch_size,
+                digest=compute_pass.source_digest,
+                bindings=compute_pass.bindings
             )
         except ShaderCompileError:
             # Re-raise specific error as-is
@@ -276,5 +284,4 @@ class PassRunner:
                         node.execution_time = elapsed_ms
                         seen_nodes.add(node)
             
-            if hasattr(graph, "execution_time_total"):
-                graph.execution_time_total += elapsed_ms
+            graph.execution_time_total += elapsed_ms
@@ -26,7 +26,7 @@ import bpy
 from .textures import TextureManager, DynamicTexturePool
 from .scalar_evaluator import ScalarEvaluator, EvalContext
 from .execution_state import ExecutionState, ResourceLifetime
-from ..ir.resources import ImageDesc
+from ..ir.resources import ImageDesc, ResourceAccess
 from ..ir.ops import OpCode
 
 logger = logging.getLogger(__name__)
@@ -330,7 +330,7 @@ class ResourceResolver:
         Returns:
             Tuple of (texture, blender_image or None)
         """
-        is_write = 'WRITE' in res_desc.access.name
+        is_write = bool(res_desc.access & ResourceAccess.WRITE)
         is_internal = getattr(res_desc, 'is_internal', True)
         
         # Ensure size is valid
@@ -396,7 +396,7 @@ class ResourceResolver:
                 continue
             
             res_desc = graph.resources[idx]
-            if res_desc.access.name not in {'WRITE', 'READ_WRITE'}:
+            if not res_desc.access & ResourceAccess.WRITE:
                 continue
             
             tex = texture_map.get(idx, original_tex)
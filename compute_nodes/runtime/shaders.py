@@ -6,11 +6,73 @@ Manages compilation and caching of GLSL compute shaders.
 
 import logging
 import hashlib
+from collections import OrderedDict
+
 import gpu
 
 logger = logging.getLogger(__name__)
 
 
+# Upper bound on compiled shaders kept alive; least recently used are dropped first
+MAX_CACHED_SHADERS = 1000
+
+# Map incompatible Blender formats
+_IMAGE_FORMAT_MAP = {
+    'SRGB8_A8': 'RGBA8', 
+    'SRGB8_A8_DXT1': 'RGBA8',
+    'SRGB8_A8_DXT3': 'RGBA8',
+    'SRGB8_A8_DXT5': 'RGBA8',
+}
+
+
+def source_digest(source: str) -> bytes:
+    """Content hash of a GLSL source (collision-safe, unlike hash())."""
+    return hashlib.blake2b(source.encode(), digest_size=16).digest()
+
+
+def shader_bindings(resources, reads_set, writes_set) -> tuple:
+    """
+    Resource bindings for a pass as a hashable tuple (part of the shader cache key).
+    
+    Each entry is ('sampler', slot, type, name) or ('image', slot, format, type, name).
+    """
+    if not resources:
+        return ()
+    
+    from ..ir.resources import ImageDesc
+    
+    bindings = []
+    # Only bind resources used in this pass
+    # Create resource index -> sequential binding slot mapping
+    # GPU has max 8 binding slots (0-7), so we remap sparse indices
+    for binding_slot, res_idx in enumerate(sorted(reads_set | writes_set)):
+        res = resources[res_idx]
+        uniform_name = f"img_{binding_slot}"  # Match GLSL codegen
+        
+        # Determine image type based on dimensions
+        dims = getattr(res, 'dimensions', 2) if isinstance(res, ImageDesc) else 2
+        if dims == 1:
+            image_type = "FLOAT_1D"
+        elif dims == 3:
+            image_type = "FLOAT_3D"
+        else:
+            image_type = "FLOAT_2D"
+        
+        # Determine binding based on PASS-SPECIFIC access
+        if res_idx in reads_set and res_idx not in writes_set:
+            # Read-only in this pass: use sampler for texture()
+            bindings.append(('sampler', binding_slot, image_type, uniform_name))
+        else:
+            # Write or read-write: use image for imageStore/imageLoad
+            if hasattr(res, 'format') and res.format:
+                raw_fmt = res.format.upper()
+                fmt = _IMAGE_FORMAT_MAP.get(raw_fmt, raw_fmt)
+            else:
+                fmt = 'RGBA32F'
+            bindings.append(('image', binding_slot, fmt, image_type, uniform_name))
+    return tuple(bindings)
+
+
 class ShaderManager:
     """
     Manages the compilation and caching of GLSL compute shaders.
@@ -18,10 +80,11 @@ class ShaderManager:
     """
     
     def __init__(self):
-        # Cache: hash(key) -> GPUShader
-        self._shader_cache = {}
+        # Cache: (source digest, bindings, local size) -> GPUShader, in LRU order
+        self._shader_cache = OrderedDict()
 
-    def get_shader(self, source: str, resources=None, reads_idx=None, writes_idx=None, dispatch_size=None):
+    def get_shader(self, source: str, resources=None, reads_idx=None, writes_idx=None, dispatch_size=None,
+                   digest=None, bindings=None):
         """
         Compile or return a cached compute shader.
         
@@ -31,17 +94,37 @@ class ShaderManager:
             reads_idx (set): Resource indices that are READ in this pass (use sampler)
             writes_idx (set): Resource indices that are WRITTEN in this pass (use image)
             dispatch_size (tuple): (w, h, d) dispatch dimensions to determine workgroup size
+            digest (bytes): source_digest(source), if already known (ComputePass.source_digest)
+            bindings (tuple): shader_bindings() result, if already known (ComputePass.bindings)
             
         Returns:
             gpu.types.GPUShader: The compiled shader.
         """
-        # OPTIMIZED: Use hash(source) as primary cache key for O(1) lookup
-        # The built-in hash() is much faster than SHA256
-        cache_key = hash(source)
+        # Define Interface from Resources
+        if bindings is None:
+            bindings = shader_bindings(resources, reads_idx or set(), writes_idx or set())
         
-        if cache_key in self._shader_cache:
+        # Workgroup size based on dispatch dimensions, not resources
+        # This prevents mismatch when sampling 3D from a 2D dispatch
+        dispatch_d = dispatch_size[2] if dispatch_size else 1
+        if dispatch_d > 1:
+            # True 3D dispatch - use 3D workgroups
+            local_size = (8, 8, 8)
+        else:
+            # 2D dispatch (even if reading from 3D textures)
+            local_size = (16, 16, 1)
+        
+        # The same source can be compiled against different bindings or
+        # workgroup sizes, so those are part of the key
+        if digest is None:
+            digest = source_digest(source)
+        cache_key = (digest, bindings, local_size)
+        
+        shader = self._shader_cache.get(cache_key)
+        if shader is not None:
+            self._shader_cache.move_to_end(cache_key)
             logger.debug(f"Shader cache HIT")
-            return self._shader_cache[cache_key]
+            return shader
         
         # Cache miss - need to compile
         logger.debug(f"Shader cache MISS - compiling new shader")
@@ -50,68 +133,14 @@ class ShaderManager:
         try:
             shader_info = gpu.types.GPUShaderCreateInfo()
             
-            # Define Interface from Resources
-            reads_set = reads_idx or set()
-            writes_set = writes_idx or set()
-            
-            if resources:
-                from ..ir.resources import ImageDesc, ResourceType
-                
-                # Only bind resources used in this pass
-                used_indices = reads_set | writes_set
-                
-                # Create resource index -> sequential binding slot mapping
-                # GPU has max 8 binding slots (0-7), so we remap sparse indices
-                sorted_indices = sorted(used_indices)
-                binding_map = {res_idx: slot for slot, res_idx in enumerate(sorted_indices)}
-                
-                for res_idx in sorted_indices:
-                    res = resources[res_idx]
-                    
-                    # Use sequential binding slot to stay within GPU limit
-                    binding_slot = binding_map[res_idx]
-                    uniform_name = f"img_{binding_slot}"  # Match GLSL codegen
-                    
-                    # Determine image type based on dimensions
-                    if isinstance(res, ImageDesc):
-                        dims = getattr(res, 'dimensions', 2)
-                        if dims == 1:
-                            sampler_type = "FLOAT_1D"
-                            image_type = "FLOAT_1D"
-                        elif dims == 3:
-                            sampler_type = "FLOAT_3D"
-                            image_type = "FLOAT_3D"
-                        else:
-                            sampler_type = "FLOAT_2D"
-                            image_type = "FLOAT_2D"
-                    else:
-                        sampler_type = "FLOAT_2D"
-                        image_type = "FLOAT_2D"
-                    
-                    # Determine binding based on PASS-SPECIFIC access
-                    is_read = res_idx in reads_set
-                    is_write = res_idx in writes_set
-                    
-                    if is_read and not is_write:
-                        # Read-only in this pass: use sampler for texture()
-                        shader_info.sampler(binding_slot, sampler_type, uniform_name)
-                    else:
-                        # Write or read-write: use image for imageStore/imageLoad
-                        if hasattr(res, 'format') and res.format:
-                            raw_fmt = res.format.upper()
-                            # Map incompatible Blender formats
-                            fmt_map = {
-                                'SRGB8_A8': 'RGBA8', 
-                                'SRGB8_A8_DXT1': 'RGBA8',
-                                'SRGB8_A8_DXT3': 'RGBA8',
-                                'SRGB8_A8_DXT5': 'RGBA8',
-                            }
-                            fmt = fmt_map.get(raw_fmt, raw_fmt)
-                        else:
-                            fmt = 'RGBA32F'
-                            
-                        qualifiers = {'READ', 'WRITE'}
-                        shader_info.image(binding_slot, fmt, image_type, uniform_name, qualifiers=qualifiers)
+            for binding in bindings:
+                if binding[0] == 'sampler':
+                    _, binding_slot, image_type, uniform_name = binding
+                    shader_info.sampler(binding_slot, image_type, uniform_name)
+                else:
+                    _, binding_slot, fmt, image_type, uniform_name = binding
+                    qualifiers = {'READ', 'WRITE'}
+                    shader_info.image(binding_slot, fmt, image_type, uniform_name, qualifiers=qualifiers)
             
             # Push constants for Position normalization
             shader_info.push_constant('INT', 'u_dispatch_width')
@@ -125,21 +154,15 @@ class ShaderManager:
             shader_info.push_constant('INT', 'u_loop_write_width')
             shader_info.push_constant('INT', 'u_loop_write_height')
             
-            # Workgroup size based on dispatch dimensions, not resources
-            # This prevents mismatch when sampling 3D from a 2D dispatch
-            dispatch_d = dispatch_size[2] if dispatch_size else 1
-            if dispatch_d > 1:
-                # True 3D dispatch - use 3D workgroups
-                shader_info.local_group_size(8, 8, 8)
-            else:
-                # 2D dispatch (even if reading from 3D textures)
-                shader_info.local_group_size(16, 16, 1)
+            shader_info.local_group_size(*local_size)
             
             # Add compute source AFTER push constants and local_group_size
             shader_info.compute_source(source)
             
             shader = gpu.shader.create_from_info(shader_info)
             self._shader_cache[cache_key] = shader
+            if len(self._shader_cache) > MAX_CACHED_SHADERS:
+                self._shader_cache.popitem(last=False)
             logger.debug(f"Compiled and cached new shader")
             return shader
             
@@ -68,5 +68,74 @@ class TestCodegen(unittest.TestCase):
         self.assertIn("ivec2(", code)
         # self.assertIn("imageStore(OutputTex_", code)
 
+    def _voronoi_code(self, detail, feature='F1', metric='EUCLIDEAN', exponent=1.0):
+        graph = Graph("VoronoiGraph")
+        builder = IRBuilder(graph)
+        val_out = builder.add_resource(ImageDesc("OutputTex", ResourceAccess.WRITE))
+        
+        val_gid = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
+        val_co = builder.cast(val_gid, DataType.VEC3)
+        inputs = [val_co] + [builder.constant(v, DataType.FLOAT) for v in (0.0, 5.0, detail, 0.5, 2.0, 1.0, exponent, 1.0)]
+        attrs = {'dimensions': '3D', 'feature': feature, 'metric': metric, 'normalize': False}
+        op = builder.add_op(OpCode.VORONOI, inputs, attrs)
+        outs = [builder._new_value(ValueKind.SSA, t, origin=op)
+                for t in (DataType.FLOAT, DataType.VEC4, DataType.VEC3, DataType.FLOAT, DataType.FLOAT)]
+        for v in outs:
+            op.add_output(v)
+        
+        val_coord = builder.cast(builder.swizzle(val_gid, "xy"), DataType.IVEC2)
+        builder.image_store(val_out, val_coord, builder.cast(outs[0], DataType.VEC4))
+        
+        passes = schedule_passes(graph)
+        return ShaderGenerator(graph).generate(passes[0])
+
+    def test_voronoi_zero_detail_uses_nofractal_variant(self):
+        """Constant Detail == 0 selects the single-octave Voronoi entry point."""
+        code = self._voronoi_code(detail=0.0)
+        self.assertIn("node_tex_voronoi_f1_nofractal_3d(", code)
+        
+        code = self._voronoi_code(detail=2.0)
+        self.assertIn("node_tex_voronoi_f1_3d(", code)
+        self.assertNotIn("node_tex_voronoi_f1_nofractal_3d(", code.split("void main()")[1])
+
+    def test_voronoi_header_only_includes_used_dimension(self):
+        """A 3D Voronoi pass ships the 3D library functions only."""
+        code = self._voronoi_code(detail=2.0)
+        self.assertIn("VoronoiOutput voronoi_f1(VoronoiParams params, float3 coord)", code)
+        self.assertNotIn("VoronoiOutput voronoi_f1(VoronoiParams params, float4 coord)", code)
+        self.assertNotIn("void node_tex_voronoi_f1_4d(", code)
+
+    def test_voronoi_header_only_includes_used_entry_points(self):
+        """Only the called entry point and the functions it depends on are shipped."""
+        code = self._voronoi_code(detail=2.0, feature='N_SPHERE_RADIUS')
+        self.assertIn("float voronoi_n_sphere_radius(VoronoiParams params, float3 coord)", code)
+        self.assertNotIn("fractal_voronoi_x_fx", code)
+        self.assertNotIn("void node_tex_voronoi_f1_3d(", code)
+        
+        code = self._voronoi_code(detail=2.0, feature='F2')
+        self.assertIn("VoronoiOutput fractal_voronoi_x_fx(VoronoiParams params, float3 coord)", code)
+        self.assertNotIn("voronoi_distance_to_edge", code)
+
+    def test_voronoi_single_metric_uses_specialized_distance(self):
+        """A pass with one Voronoi metric ships branch-free distance overloads."""
+        code = self._voronoi_code(detail=2.0)
+        self.assertIn("float voronoi_distance(float3 a, float3 b, VoronoiParams params) { return distance(a, b); }", code)
+        self.assertNotIn("params.metric == SHD_VORONOI_EUCLIDEAN", code)
+
+    def test_voronoi_constant_randomness_precomputes_max_distance(self):
+        """Constant Randomness folds max_distance into a literal call argument."""
+        code = self._voronoi_code(detail=2.0)
+        call = [l for l in code.split("void main()")[1].splitlines() if "node_tex_voronoi_f1_3d(" in l][0]
+        # Randomness 1.0, 3D Euclidean: length(vec3(1.0)) == sqrt(3)
+        self.assertIn(f"{3 ** 0.5!r}f", call)
+        self.assertNotIn("-1.0f", call)
+
+    def test_voronoi_tiny_minkowski_exponent_keeps_max_distance_in_shader(self):
+        """A Minkowski bound that overflows float32 falls back to the in-shader path."""
+        for exponent in (0.001, 0.01):
+            code = self._voronoi_code(detail=2.0, metric='MINKOWSKI', exponent=exponent)
+            call = [l for l in code.split("void main()")[1].splitlines() if "node_tex_voronoi_f1_3d(" in l][0]
+            self.assertIn("-1.0f", call)
+
 if __name__ == "__main__":
     unittest.main()
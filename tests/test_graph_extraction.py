@@ -172,6 +172,96 @@ class TestGraphExtraction(unittest.TestCase):
             
         print("PASS")
 
+    def test_deep_chain_extraction(self):
+        """A chain longer than the recursion limit extracts with one op per node."""
+        import sys
+        
+        tree = MockNodeTreeNew("DeepTree")
+        depth = sys.getrecursionlimit() + 100
+        
+        prev_out = None
+        prev_node = None
+        for i in range(depth):
+            node = MockNodeNew('ComputeNodeMath', f"Math {i}")
+            sock_a = MockSocketNew("Value", default_value=1.0)
+            sock_b = MockSocketNew("Value", default_value=1.0)
+            sock_res = MockSocketNew("Value")
+            node.inputs.append(sock_a)
+            node.inputs.append(sock_b)
+            node.outputs.append(sock_res)
+            tree.nodes.append(node)
+            if prev_out is not None:
+                link = MockLinkNew(prev_out, prev_node, sock_a, node)
+                prev_out.is_linked = True; prev_out.links = [link]
+                sock_a.is_linked = True; sock_a.links = [link]
+            prev_out, prev_node = sock_res, node
+        
+        node_capture = MockNodeNew('ComputeNodeCapture', "Capture")
+        sock_field_in = MockSocketNew("Field")
+        node_capture.inputs.append(sock_field_in)
+        node_capture.inputs.append(MockSocketNew("Width", default_value=64))
+        node_capture.inputs.append(MockSocketNew("Height", default_value=64))
+        sock_grid_out = MockSocketNew("Grid", type='GRID')
+        node_capture.outputs.append(sock_grid_out)
+        tree.nodes.append(node_capture)
+        
+        node_out = MockNodeNew('ComputeNodeOutputImage', "Output")
+        sock_grid_in = MockSocketNew("Grid", type='GRID')
+        node_out.inputs.append(sock_grid_in)
+        tree.nodes.append(node_out)
+        
+        link = MockLinkNew(prev_out, prev_node, sock_field_in, node_capture)
+        prev_out.is_linked = True; prev_out.links = [link]
+        sock_field_in.is_linked = True; sock_field_in.links = [link]
+        link = MockLinkNew(sock_grid_out, node_capture, sock_grid_in, node_out)
+        sock_grid_out.is_linked = True; sock_grid_out.links = [link]
+        sock_grid_in.is_linked = True; sock_grid_in.links = [link]
+        
+        graph = extract_graph(tree)
+        
+        add_ops = [op for op in graph.blocks[0].ops if op.opcode == OpCode.ADD]
+        self.assertEqual(len(add_ops), depth)
+
+    def test_position_builds_only_requested_output(self):
+        """Position with only Coordinate linked emits no Normalized / Global Index ops."""
+        tree = MockNodeTreeNew("PositionTree")
+        
+        node_pos = MockNodeNew('ComputeNodePosition', "Position")
+        sock_coord = MockSocketNew("Coordinate", type='VECTOR')
+        node_pos.outputs.append(sock_coord)
+        node_pos.outputs.append(MockSocketNew("Normalized", type='VECTOR'))
+        node_pos.outputs.append(MockSocketNew("Global Index", type='INT'))
+        tree.nodes.append(node_pos)
+        
+        node_capture = MockNodeNew('ComputeNodeCapture', "Capture")
+        sock_field_in = MockSocketNew("Field", type='VECTOR')
+        node_capture.inputs.append(sock_field_in)
+        node_capture.inputs.append(MockSocketNew("Width", default_value=64))
+        node_capture.inputs.append(MockSocketNew("Height", default_value=64))
+        sock_grid_out = MockSocketNew("Grid", type='GRID')
+        node_capture.outputs.append(sock_grid_out)
+        tree.nodes.append(node_capture)
+        
+        node_out = MockNodeNew('ComputeNodeOutputImage', "Output")
+        sock_grid_in = MockSocketNew("Grid", type='GRID')
+        node_out.inputs.append(sock_grid_in)
+        tree.nodes.append(node_out)
+        
+        link = MockLinkNew(sock_coord, node_pos, sock_field_in, node_capture)
+        sock_coord.is_linked = True; sock_coord.links = [link]
+        sock_field_in.is_linked = True; sock_field_in.links = [link]
+        link = MockLinkNew(sock_grid_out, node_capture, sock_grid_in, node_out)
+        sock_grid_out.is_linked = True; sock_grid_out.links = [link]
+        sock_grid_in.is_linked = True; sock_grid_in.links = [link]
+        
+        graph = extract_graph(tree)
+        
+        ops = [op for block in graph.blocks for op in block.ops]
+        builtins = {op.attrs.get('name') for op in ops if op.opcode == OpCode.BUILTIN}
+        self.assertIn("gl_GlobalInvocationID", builtins)
+        self.assertNotIn("gl_NumWorkGroups", builtins)
+        self.assertFalse(any(op.opcode == OpCode.DIV for op in ops))
+
     def _create_mock_image(self, name):
         # Helper to create a more robust mock image if needed
         # Since we use bpy.types.Image in real code, but here heavily mocked inputs
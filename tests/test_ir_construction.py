@@ -1,4 +1,5 @@
 
+import math
 import sys
 import os
 
@@ -95,6 +96,80 @@ def test_ir_construction():
     for i, op in enumerate(graph.blocks[0].ops):
         print(f"  {i}: {op} -> Writes: {op.writes_resources()}")
 
+def test_primary_output():
+    graph = Graph("test_kernel")
+    builder = IRBuilder(graph)
+    
+    builder.add_resource(ImageDesc("img_in", access=ResourceAccess.READ, size=(64, 64)))
+    builder.add_resource(ImageDesc("unsized", access=ResourceAccess.WRITE))
+    assert graph.primary_output is None
+    
+    out_desc = ImageDesc("img_out", access=ResourceAccess.WRITE, size=(256, 128))
+    builder.add_resource(out_desc)
+    builder.add_resource(ImageDesc("img_out2", access=ResourceAccess.READ_WRITE, size=(32, 32)))
+    
+    # First sized write target wins
+    assert graph.primary_output is out_desc
+
+def test_enum_members_stay_distinct():
+    # DataType and OpCode share auto() values but must never compare equal
+    assert DataType.FLOAT != OpCode.ADD
+    assert DataType.FLOAT != 1 and OpCode.ADD != 1
+    assert len({DataType.FLOAT, OpCode.ADD, 1}) == 3
+    assert {DataType.VEC3: 'a'}.get(DataType.VEC3) == 'a'
+    assert str(OpCode.ADD) == "OpCode.ADD" and str(DataType.VEC3) == "vec3"
+
+def test_constant_keeps_signed_zero_apart():
+    graph = Graph("test_kernel")
+    builder = IRBuilder(graph)
+    
+    val_pos = builder.constant(0.0, DataType.FLOAT)
+    val_neg = builder.constant(-0.0, DataType.FLOAT)
+    assert val_neg is not val_pos
+    assert math.copysign(1.0, val_neg.origin.attrs['value']) < 0
+    assert builder.constant(0.0, DataType.FLOAT) is val_pos
+    
+    vec_neg = builder.constant((0.0, -0.0, 1.0), DataType.VEC3)
+    assert vec_neg is not builder.constant((0.0, 0.0, 1.0), DataType.VEC3)
+    assert builder.constant((0.0, -0.0, 1.0), DataType.VEC3) is vec_neg
+
+def test_cast_reuses_existing_conversion():
+    graph = Graph("test_kernel")
+    builder = IRBuilder(graph)
+    
+    val = builder.constant(1, DataType.INT)
+    assert builder.cast(val, DataType.INT) is val
+    
+    as_float = builder.cast(val, DataType.FLOAT)
+    assert builder.cast(val, DataType.FLOAT) is as_float
+    assert builder.cast(val, DataType.VEC3) is not as_float
+    assert sum(op.opcode == OpCode.CAST for op in graph.blocks[0].ops) == 2
+
+def test_cast_round_trip_folds_to_source():
+    graph = Graph("test_kernel")
+    builder = IRBuilder(graph)
+    
+    val_gid = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
+    val_signed = builder.cast(val_gid, DataType.IVEC3)
+    assert builder.cast(val_signed, DataType.UVEC3) is val_gid
+    
+    # Lossy round trips are kept
+    val_float = builder.cast(val_signed, DataType.VEC3)
+    assert builder.cast(val_float, DataType.IVEC3) is not val_signed
+
+def test_store_coordinate_is_built_once():
+    graph = Graph("test_kernel")
+    builder = IRBuilder(graph)
+    
+    coords = []
+    for _ in range(3):
+        val_gid = builder.builtin("gl_GlobalInvocationID", DataType.UVEC3)
+        coords.append(builder.cast(builder.swizzle(val_gid, "xy"), DataType.IVEC2))
+    
+    assert coords[0] is coords[1] is coords[2]
+    assert builder.swizzle(val_gid, "x") is not builder.swizzle(val_gid, "xy")
+    assert len(graph.blocks[0].ops) == 4
+
 if __name__ == "__main__":
     try:
         test_ir_construction()
@@ -114,6 +114,28 @@ class TestRuntime(unittest.TestCase):
         self.assertEqual(mock_gpu.shader.create_from_info.call_count, 1)
         self.assertEqual(s1, s2)
 
+    def test_shader_manager_cache_keys_on_interface(self):
+        src = "void main() {}"
+        
+        self.shader_mgr.get_shader(src, dispatch_size=(64, 64, 1))
+        self.shader_mgr.get_shader(src, dispatch_size=(64, 64, 1))
+        self.assertEqual(mock_gpu.shader.create_from_info.call_count, 1)
+        
+        # Same source with 3D workgroups is a different shader
+        self.shader_mgr.get_shader(src, dispatch_size=(64, 64, 64))
+        self.assertEqual(mock_gpu.shader.create_from_info.call_count, 2)
+
+    def test_shader_manager_cache_uses_stored_key(self):
+        src = "void main() {}"
+        
+        # Digest and bindings stored on the pass are used as given
+        self.shader_mgr.get_shader(src, digest=b"pass-a", bindings=())
+        self.shader_mgr.get_shader(src, digest=b"pass-a", bindings=())
+        self.assertEqual(mock_gpu.shader.create_from_info.call_count, 1)
+        
+        self.shader_mgr.get_shader(src, digest=b"pass-b", bindings=())
+        self.assertEqual(mock_gpu.shader.create_from_info.call_count, 2)
+
     def test_executor_flow(self):
         # Setup Graph and Pass
         graph = Graph()
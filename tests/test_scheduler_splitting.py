@@ -128,8 +128,7 @@ class TestPassSplittingBySize:
         pos_out = builder._new_value(ValueKind.SSA, DataType.VEC3, origin=pos_op)
         pos_op.add_output(pos_out)
         
-        const = builder._new_value(ValueKind.CONSTANT, DataType.FLOAT)
-        const.attrs = {'value': 2.0}
+        const = builder.constant(2.0, DataType.FLOAT)
         mul = builder.add_op(OpCode.MUL, [pos_out, const])
         mul_out = builder._new_value(ValueKind.SSA, DataType.VEC3, origin=mul)
         mul.add_output(mul_out)